@@ -1,72 +1,134 @@
-import os
+import importlib
+import queue
 import threading
-import qrcode
-import cv2
-import pandas as pd
-from pyzbar.pyzbar import decode
-from PIL import Image as PILImage
 
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
 from kivy.uix.label import Label
+from kivy.uix.image import Image as KivyImage
 from kivy.uix.popup import Popup
-from kivy.clock import mainthread
-from kivy.core.window import Window
+from kivy.clock import Clock, mainthread
 
+# cv2 / pyzbar (scanner, frame sources) and qrcode / PIL (qr_render) are
+# imported inside the features that use them, not at startup
+from utils.background import BackgroundRunner
+from utils.assets import register_fonts
+from utils.session_tokens import ExpiredToken, InvalidToken, MissingSecret, is_session_token
+from utils.kiosk import KioskSession
 from utils.helpers import (
-    ensure_attendance_csv,
     get_wifi_ssid,
-    update_attendance,
+    warm_db_pool,
+    start_partition_maintenance,
+    start_roster_refresh,
+    start_network_presence,
+    authenticate_student,
+    get_student_by_roll,
+    ensure_session,
+    session_tokens,
+    submit_attendance,
+    close_attendance_writers,
+    get_student_attendance,
+    iter_class_attendance,
+    MARK_MARKED,
+    MARK_DUPLICATE,
+    MARK_NO_SESSION,
+    MARK_UNKNOWN_STUDENT,
+    MARK_QUEUED,
     TEACHER_CREDENTIALS,
+    WINDOW_SIZE,
     EXPECTED_WIFI,
-    CSV_FILE,
     SUBJECTS,
-    students,
+    SCAN_CONFIG,
+    SCAN_PIPELINE_CONFIG,
+    SCAN_DISPLAY_FPS,
+    SCAN_SOURCE,
+    STUDENT_QR_PREFIX,
+    KIOSK_SCAN_CONFIG,
+    KIOSK_PIPELINE_CONFIG,
+    KIOSK_DEDUPE_SECONDS,
+    QR_RENDER_CONFIG,
+    STUDENT_QR_SIZE,
+    QR_CACHE_SIZE,
+    SESSION_TOKEN_ROTATE_SECONDS,
+    ALLOW_PLAIN_CLASS_QR,
+    ALLOW_PRINTED_SESSION_QR,
+    OFFLINE_JOURNAL,
 )
 
-# Screens
-from screens.login import LoginScreen
-from screens.student_login import StudentLoginScreen
-from screens.teacher_login import TeacherLoginScreen
-from screens.student_dashboard import StudentDashboardScreen
-from screens.teacher_dashboard import TeacherDashboardScreen
-from screens.attendance_view import AttendanceViewScreen
-from screens.student_attendance import StudentAttendanceScreen
+# Screens: name -> (module, class), imported and built on first navigation
+SCREEN_FACTORIES = {
+    "login": ("screens.login", "LoginScreen"),
+    "student_login": ("screens.student_login", "StudentLoginScreen"),
+    "teacher_login": ("screens.teacher_login", "TeacherLoginScreen"),
+    "student_dashboard": ("screens.student_dashboard", "StudentDashboardScreen"),
+    "teacher_dashboard": ("screens.teacher_dashboard", "TeacherDashboardScreen"),
+    "attendance_view": ("screens.attendance_view", "AttendanceViewScreen"),
+    "student_attendance": ("screens.student_attendance", "StudentAttendanceScreen"),
+}
 
 
 class AttendanceApp(App):
     def build(self):
-        # ensure_attendance_csv()
-        Window.size = (450, 700)
+        from kivy.core.window import Window
 
-        self.sm = ScreenManager()
+        # ensure_attendance_csv()
+        Window.size = WINDOW_SIZE
+        # subsetted fonts from tools/build_assets.py, if built; tables pick them up via font_name()
+        register_fonts()
 
-        # create screens and add to manager
-        self.sm.add_widget(LoginScreen(name="login"))
-        self.sm.add_widget(StudentLoginScreen(name="student_login"))
-        self.sm.add_widget(TeacherLoginScreen(name="teacher_login"))
-        self.sm.add_widget(StudentDashboardScreen(name="student_dashboard"))
-        self.sm.add_widget(TeacherDashboardScreen(name="teacher_dashboard"))
+        # open DB connections and load the roster while the first screens are being built
+        warm_db_pool()
+        start_partition_maintenance()
+        start_roster_refresh()
+        start_network_presence()
 
-        self.attendance_view_screen = AttendanceViewScreen(name="attendance_view")
-        self.sm.add_widget(self.attendance_view_screen)
+        # database / network calls run here, never on the UI thread
+        self.runner = BackgroundRunner()
+        self.loading_popup = None
+        self.loading_task = None
+        # QR codes rendered straight to textures; created on first use (see qr_textures)
+        self._qr_cache = None
+        # (class_name, session_id) shown as a rotating signed code, and its Clock event
+        self.session_qr = None
+        self.session_qr_event = None
 
-        self.student_attendance_screen = StudentAttendanceScreen(name="student_attendance")
-        self.sm.add_widget(self.student_attendance_screen)
+        # only the first screen is built now; the rest on first navigation
+        self.sm = ScreenManager()
+        self.screen("login")
 
         # runtime state
+        self.student_id = None
         self.student_name = None
+        self.student_roll = None
         self.current_class_id = None
+        self.teacher_classes = []
 
         return self.sm
 
     # ---------------- navigation helpers ----------------
+    def screen(self, screen_name):
+        """Return the named screen, importing and building it the first time."""
+        if not self.sm.has_screen(screen_name):
+            module_name, class_name = SCREEN_FACTORIES[screen_name]
+            screen_class = getattr(importlib.import_module(module_name), class_name)
+            self.sm.add_widget(screen_class(name=screen_name))
+        return self.sm.get_screen(screen_name)
+
     def go_to_screen(self, screen_name):
+        self.screen(screen_name)
         self.sm.current = screen_name
 
     def logout_to_login(self):
+        self.runner.cancel_all()
+        self.stop_session_qr()
+        self.hide_loading()
+        self.student_id = None
         self.student_name = None
+        self.student_roll = None
         self.current_class_id = None
+        self.teacher_classes = []
         self.go_to_screen("login")
 
     # ---------------- generic popup helper (replaces messagebox) ----------------
@@ -74,120 +136,330 @@ class AttendanceApp(App):
         p = Popup(title=title, content=Label(text=msg), size_hint=(0.8, 0.4))
         p.open()
 
+    # ---------------- loading indicator for background work ----------------
+    def show_loading(self, msg, task=None):
+        """Show a modal 'please wait' popup; its Cancel button cancels `task`."""
+        self.hide_loading()
+        content = BoxLayout(orientation="vertical", spacing=10, padding=10)
+        content.add_widget(Label(text=msg))
+        cancel_btn = Button(text="Cancel", size_hint=(1, 0.4))
+        content.add_widget(cancel_btn)
+        self.loading_popup = Popup(title="Please wait", content=content,
+                                   size_hint=(0.8, 0.3), auto_dismiss=False)
+        self.loading_task = task
+        cancel_btn.bind(on_press=lambda inst: self.cancel_loading())
+        self.loading_popup.open()
+
+    def hide_loading(self):
+        if self.loading_popup:
+            self.loading_popup.dismiss()
+            self.loading_popup = None
+            self.loading_task = None
+
+    def cancel_loading(self):
+        if self.loading_task:
+            self.loading_task.cancel()
+        self.hide_loading()
+
+    def run_with_loading(self, msg, fn, *args, on_success=None, on_error=None):
+        """Run fn in the background behind a loading popup; callbacks run on the UI thread."""
+        def done(result):
+            self.hide_loading()
+            if on_success:
+                on_success(result)
+
+        def failed(error):
+            self.hide_loading()
+            if on_error:
+                on_error(error)
+            else:
+                self.popup("Error", str(error))
+
+        task = self.runner.run(fn, *args, on_success=done, on_error=failed)
+        self.show_loading(msg, task)
+        return task
+
     # ---------------- login validation (matches original logic) ----------------
     def validate_login(self, user_type, user_id, password):
         if user_type == "Student":
-            if user_id in students and students[user_id][1] == password:
-                self.student_name = students[user_id][0]
-                self.popup("Login Success", f"Welcome, {self.student_name}")
-                self.go_to_screen("student_dashboard")
-            else:
-                self.popup("Wrong Credentials", "Invalid ID or Password")
+            # the first login may have to wait for the roster to load
+            self.run_with_loading("Signing in...", authenticate_student, user_id, password,
+                                  on_success=self._on_student_authenticated)
 
         elif user_type == "Teacher":
-            for class_id, (stored_id, stored_pass) in TEACHER_CREDENTIALS.items():
-                if user_id == stored_id and password == stored_pass:
-                    self.current_class_id = class_id
-                    self.popup("Login Success", f"Welcome, {user_id}!")
-                    # update teacher dashboard label & image
-                    t_screen = self.sm.get_screen("teacher_dashboard")
-                    t_screen.class_id_label.text = f"Teacher Dashboard ({class_id})"
-                    # if qr already exists, show it
-                    img_path = f"qr_codes/{class_id}.png"
-                    if os.path.exists(img_path):
-                        t_screen.qr_image.source = img_path
-                        t_screen.qr_image.reload()
-                    self.go_to_screen("teacher_dashboard")
-                    return
-            self.popup("Invalid Credentials", "Incorrect User ID or Password!")
+            # a teacher may hold credentials for more than one class
+            classes = [class_id for class_id, (stored_id, stored_pass) in TEACHER_CREDENTIALS.items()
+                       if user_id == stored_id and password == stored_pass]
+            if not classes:
+                self.popup("Invalid Credentials", "Incorrect User ID or Password!")
+                return
+            class_id = classes[0]
+            self.current_class_id = class_id
+            self.teacher_classes = classes
+            self.popup("Login Success", f"Welcome, {user_id}!")
+            # update teacher dashboard label & image
+            t_screen = self.screen("teacher_dashboard")
+            t_screen.class_id_label.text = f"Teacher Dashboard ({class_id})"
+            self.go_to_screen("teacher_dashboard")
+
+    def _on_student_authenticated(self, student):
+        if student:
+            self.student_id = student.student_id
+            self.student_name = student.name
+            self.student_roll = student.roll_no
+            self.popup("Login Success", f"Welcome, {self.student_name}")
+            self.go_to_screen("student_dashboard")
+        else:
+            self.popup("Wrong Credentials", "Invalid ID or Password")
 
     # ---------------- QR generation (ties to teacher dashboard) ----------------
     def generate_qr_current_class(self):
         if not self.current_class_id:
             self.popup("Error", "No class selected.")
             return
+        if not session_tokens.configured:
+            self.popup("Error", "ATTENDANCE_TOKEN_SECRET is not set, session QR codes are disabled")
+            return
 
         class_id = self.current_class_id
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(class_id)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        if not os.path.exists("qr_codes"):
-            os.makedirs("qr_codes")
-
-        img_path = f"qr_codes/{class_id}.png"
-        img.save(img_path)
-
-        # Resize via PIL (keep parity with original behavior)
-        try:
-            pil_img = PILImage.open(img_path)
-            pil_img.thumbnail((200, 200))
-            pil_img.save(img_path)
-        except Exception:
-            pass
-
-        t_screen = self.sm.get_screen("teacher_dashboard")
-        t_screen.qr_image.source = img_path
-        t_screen.qr_image.reload()
+        self.run_with_loading(
+            "Starting session...", ensure_session, class_id,
+            on_success=lambda session_id: self._on_session_ready(class_id, session_id),
+            on_error=lambda e: self.popup("Error", f"Could not start a session: {e}"),
+        )
+
+    def _on_session_ready(self, class_id, session_id):
+        if session_id is None:
+            self.popup("Error", f"Could not start a session for {class_id}")
+            return
+        self.stop_session_qr()
+        self.session_qr = (class_id, session_id)
+        self._rotate_session_qr()
+        self.session_qr_event = Clock.schedule_interval(self._rotate_session_qr, SESSION_TOKEN_ROTATE_SECONDS)
         self.popup("Success", f"QR generated for {class_id}")
 
+    def _rotate_session_qr(self, dt=0):
+        """Show a freshly signed token; older ones expire on their own."""
+        from utils.qr_render import render_qr_texture
+
+        token = session_tokens.issue(*self.session_qr)
+        t_screen = self.screen("teacher_dashboard")
+        t_screen.qr_image.texture = render_qr_texture(token, **QR_RENDER_CONFIG)
+
+    def stop_session_qr(self):
+        if self.session_qr_event is not None:
+            self.session_qr_event.cancel()
+            self.session_qr_event = None
+        if self.session_qr is not None:
+            self.session_qr = None
+            self.screen("teacher_dashboard").qr_image.texture = None
+
+    def qr_textures(self):
+        if self._qr_cache is None:
+            from utils.qr_render import QrTextureCache
+            self._qr_cache = QrTextureCache(QR_CACHE_SIZE, **QR_RENDER_CONFIG)
+        return self._qr_cache
+
+    def show_student_qr(self):
+        """Show the logged-in student's check-in code for kiosk scanning"""
+        if not self.student_roll:
+            self.popup("Error", "No student logged in")
+            return
+        texture = self.qr_textures().texture(f"{STUDENT_QR_PREFIX}{self.student_roll}", size=STUDENT_QR_SIZE)
+        image = KivyImage(texture=texture)
+        Popup(title=f"Check-in code - {self.student_name}", content=image,
+              size_hint=(0.9, 0.6)).open()
+
     # ---------------- QR scanning (threaded) ----------------
     def start_scan_thread(self):
         t = threading.Thread(target=self._scan_qr_thread, daemon=True)
         t.start()
 
     def _scan_qr_thread(self):
-        cap = cv2.VideoCapture(0)
+        import cv2
+        from utils.frame_sources import open_frame_source
+        from utils.scanner import QrScanner, ScanPipeline
+
+        cap = open_frame_source(SCAN_SOURCE)
+        pipeline = ScanPipeline(cap, lambda: QrScanner(**SCAN_CONFIG), **SCAN_PIPELINE_CONFIG)
+        pipeline.start()
         print("Scanning... Place the QR code in front of the camera.")
 
-        class_id = None
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            decoded_objs = decode(frame)
-            for obj in decoded_objs:
-                class_id = obj.data.decode('utf-8')
+        # this thread only displays frames; capture and decode run in the pipeline
+        delay_ms = max(int(1000 / SCAN_DISPLAY_FPS), 1)
+        payload = None
+        while pipeline.running():
+            frame = pipeline.latest_frame()
+            if frame is not None:
+                cv2.imshow("QR Code Scanner", frame)
+            try:
+                payload = pipeline.results.get_nowait()[0].data
                 break
-            cv2.imshow("QR Code Scanner", frame)
-            if class_id:
-                break
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            except queue.Empty:
+                pass
+            if cv2.waitKey(delay_ms) & 0xFF == ord('q'):
                 break
 
+        pipeline.stop()
         cap.release()
         cv2.destroyAllWindows()
+        print("Scan stats:", pipeline.report())
 
-        if class_id:
-            self.process_scan_result(class_id)
+        if payload:
+            self.process_scan_result(payload)
         else:
-            self.popup("Error", "No QR code detected or scan cancelled.")
+            self.scan_failed()
+
+    # ---------------- kiosk mode (teacher side, many students) ----------------
+    def start_kiosk_thread(self):
+        if not self.current_class_id:
+            self.popup("Error", "No class selected.")
+            return
+        # resolve or open the session once, not per scanned frame
+        class_id = self.current_class_id
+        self.run_with_loading(
+            "Starting session...", ensure_session, class_id,
+            on_success=lambda session_id: self._on_kiosk_session(class_id, session_id),
+            on_error=lambda e: self._on_kiosk_session(class_id, None, e),
+        )
+
+    def _on_kiosk_session(self, class_id, session_id, error=None):
+        if session_id is None:
+            if not OFFLINE_JOURNAL:
+                self.popup("Error", f"Could not start a session: {error or class_id}")
+                return
+            # marks are journaled with class and scan time; the server matches
+            # them to the session running at that time when they are uploaded
+            self.popup("Offline", f"Could not reach the session for {class_id}, "
+                                  "check-ins are saved on this device")
+        t = threading.Thread(target=self._kiosk_thread, args=(class_id, session_id), daemon=True)
+        t.start()
+
+    def _kiosk_thread(self, class_id, session_id):
+        import cv2
+        from utils.frame_sources import open_frame_source
+        from utils.scanner import QrScanner, ScanPipeline
+
+        kiosk = KioskSession(class_id, session_id, get_student_by_roll,
+                             submit_attendance, KIOSK_DEDUPE_SECONDS)
+        cap = open_frame_source(SCAN_SOURCE)
+        pipeline = ScanPipeline(cap, lambda: QrScanner(**KIOSK_SCAN_CONFIG),
+                                on_detections=kiosk.handle, **KIOSK_PIPELINE_CONFIG)
+        pipeline.start()
+        print(f"Kiosk check-in for {class_id}... press 'q' to finish.")
+
+        delay_ms = max(int(1000 / SCAN_DISPLAY_FPS), 1)
+        while pipeline.running():
+            frame = pipeline.latest_frame()
+            if frame is not None:
+                frame = frame.copy()
+                cv2.putText(frame, kiosk.summary(), (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 160, 0), 2)
+                if kiosk.last_marked:
+                    cv2.putText(frame, f"Last: {kiosk.last_marked}", (10, 60),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 160, 0), 2)
+                cv2.imshow(f"Kiosk Check-in ({class_id})", frame)
+            if cv2.waitKey(delay_ms) & 0xFF == ord('q'):
+                break
+
+        pipeline.stop()
+        cap.release()
+        cv2.destroyAllWindows()
+        print("Kiosk stats:", pipeline.report())
+        self.kiosk_finished(class_id, kiosk.summary())
 
     @mainthread
-    def process_scan_result(self, class_id):
-        if class_id and class_id in SUBJECTS:
-            wifi_ssid = get_wifi_ssid()
-            if wifi_ssid == EXPECTED_WIFI:
-                if update_attendance(self.student_name, class_id):
-                    self.popup("Success", f"Attendance marked for {class_id}")
-                else:
-                    self.popup("Error", "Invalid Class ID")
-            else:
-                self.popup("Error", "Wrong WiFi Network")
+    def kiosk_finished(self, class_id, summary):
+        self.popup(f"Check-in finished ({class_id})", summary)
+
+    @mainthread
+    def scan_failed(self):
+        self.popup("Error", "No QR code detected or scan cancelled.")
+
+    @mainthread
+    def process_scan_result(self, data):
+        # signed session codes are checked here, before anything reaches the database
+        session_id = None
+        if is_session_token(data):
+            try:
+                token = session_tokens.verify(data)
+            except ExpiredToken:
+                self.popup("Error", "QR Code expired, scan the code on screen now")
+                return
+            except MissingSecret:
+                self.popup("Error", "ATTENDANCE_TOKEN_SECRET is not set on this device")
+                return
+            except InvalidToken:
+                self.popup("Error", "Invalid QR Code")
+                return
+            if token.printed and not ALLOW_PRINTED_SESSION_QR:
+                self.popup("Error", "Printed QR codes are not accepted, scan the code on screen")
+                return
+            class_id, session_id = token.class_name, token.session_id
         else:
+            class_id = data if ALLOW_PLAIN_CLASS_QR else None
+        if not (class_id and class_id in SUBJECTS):
             self.popup("Error", "Invalid QR Code")
+            return
+        # cached SSID, no subprocess on the scan path
+        if get_wifi_ssid() != EXPECTED_WIFI:
+            self.popup("Error", "Wrong WiFi Network")
+            return
+        future = submit_attendance(self.student_id, class_id, session_id=session_id)
+        task = self.runner.watch(
+            future,
+            on_success=lambda status: self.show_mark_result(class_id, status),
+            on_error=lambda error: self.show_mark_result(class_id, None),
+        )
+        self.show_loading("Marking attendance...", task)
+
+    def show_mark_result(self, class_id, status):
+        self.hide_loading()
+        if status in (MARK_MARKED, MARK_QUEUED):
+            # queued marks are saved on this device and uploaded in the background
+            self.popup("Success", f"Attendance marked for {class_id}")
+        elif status == MARK_DUPLICATE:
+            self.popup("Already Marked", f"Attendance already marked for {class_id}")
+        elif status == MARK_NO_SESSION:
+            self.popup("Error", f"No active session for {class_id}")
+        elif status == MARK_UNKNOWN_STUDENT:
+            self.popup("Error", "Student not found")
+        else:
+            self.popup("Error", "Could not reach the attendance server")
 
     # ---------------- screens to show attendance ----------------
+    def show_teacher_attendance_screen(self):
+        """
+        Stream the logged-in teacher's classes, pivoted to one row per student;
+        rows appear batch by batch as they arrive
+        """
+        self.runner.cancel_all(tag="attendance_stream")
+        screen = self.screen("attendance_view")
+        screen.show_classes(self.teacher_classes)
+        self.go_to_screen("attendance_view")
+        self.runner.stream(
+            iter_class_attendance, self.teacher_classes,
+            on_batch=screen.append_from_database,
+            on_error=lambda e: self.popup("Error", f"Failed to load attendance: {e}"),
+            tag="attendance_stream",
+        )
+
     def show_student_attendance_screen(self):
         """Display attendance screen for currently logged in student"""
-        if not self.student_name:
+        if not self.student_id:
             self.popup("Error", "No student logged in")
             return
 
-        try:
-            # populate_for_student now uses database queries instead of CSV
-            self.student_attendance_screen.populate_for_student(self.student_name)
-            self.go_to_screen("student_attendance")
-        except Exception as e:
-            self.popup("Error", f"Failed to load attendance data: {e}")
\ No newline at end of file
+        self.run_with_loading(
+            "Loading attendance...", get_student_attendance, self.student_id,
+            on_success=self._on_student_attendance_loaded,
+            on_error=lambda e: self.popup("Error", f"Failed to load attendance data: {e}"),
+        )
+
+    def _on_student_attendance_loaded(self, attendance_data):
+        self.screen("student_attendance").populate_for_student(self.student_name, attendance_data)
+        self.go_to_screen("student_attendance")
+
+    def on_stop(self):
+        self.runner.shutdown()
+        close_attendance_writers()
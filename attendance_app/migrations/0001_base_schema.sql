@@ -0,0 +1,41 @@
+-- ======================================================
+-- 0001: tables queried by utils/helpers.py
+-- ======================================================
+-- IF NOT EXISTS so databases created by hand before the migration runner
+-- existed can be brought under version control without data loss.
+
+CREATE TABLE IF NOT EXISTS Teachers (
+    teacher_id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Students (
+    student_id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    roll_no VARCHAR(50) UNIQUE NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Classes (
+    class_id SERIAL PRIMARY KEY,
+    class_name VARCHAR(100) UNIQUE NOT NULL,
+    teacher_id INT REFERENCES Teachers(teacher_id)
+);
+
+CREATE TABLE IF NOT EXISTS Enrollments (
+    student_id INT NOT NULL REFERENCES Students(student_id),
+    class_id INT NOT NULL REFERENCES Classes(class_id),
+    PRIMARY KEY (student_id, class_id)
+);
+
+CREATE TABLE IF NOT EXISTS Sessions (
+    session_id SERIAL PRIMARY KEY,
+    class_id INT NOT NULL REFERENCES Classes(class_id),
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    qr_token VARCHAR(255)
+);
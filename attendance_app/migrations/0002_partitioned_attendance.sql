@@ -0,0 +1,85 @@
+-- ======================================================
+-- 0002: Attendance, range-partitioned by month
+-- ======================================================
+-- The partition key is session_start (a copy of Sessions.start_time) rather
+-- than marked_at: PostgreSQL only enforces uniqueness on a partitioned table
+-- when the key contains the partition column, and session_start is fixed per
+-- session, so UNIQUE (session_id, student_id, session_start) still means one
+-- mark per student per session. Marks land in the month of their session,
+-- which is the month they are scanned in.
+
+DO $$
+BEGIN
+    IF to_regclass('attendance') IS NOT NULL THEN
+        ALTER TABLE attendance RENAME TO attendance_legacy;
+    END IF;
+END $$;
+
+CREATE TABLE Attendance (
+    attendance_id BIGSERIAL,
+    session_id INT NOT NULL REFERENCES Sessions(session_id),
+    student_id INT NOT NULL REFERENCES Students(student_id),
+    session_start TIMESTAMP NOT NULL,
+    marked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (attendance_id, session_start),
+    UNIQUE (session_id, student_id, session_start)
+) PARTITION BY RANGE (session_start);
+
+-- Catches rows for months nobody created a partition for
+CREATE TABLE attendance_default PARTITION OF Attendance DEFAULT;
+
+CREATE OR REPLACE FUNCTION ensure_attendance_partition(p_month DATE) RETURNS VOID AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::DATE;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    v_name TEXT := 'attendance_' || to_char(v_start, 'YYYY_MM');
+BEGIN
+    IF to_regclass(v_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF Attendance FOR VALUES FROM (%L) TO (%L)',
+            v_name, v_start, v_end
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ensure_attendance_partitions(p_from DATE, p_to DATE) RETURNS VOID AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from)::DATE;
+BEGIN
+    WHILE v_month <= p_to LOOP
+        PERFORM ensure_attendance_partition(v_month);
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_attendance_partitions(CURRENT_DATE, (CURRENT_DATE + INTERVAL '3 months')::DATE);
+
+-- Carry over marks from an unpartitioned Attendance table, keeping the
+-- earliest mark when a student was recorded twice for one session.
+DO $$
+DECLARE
+    v_first DATE;
+    v_last DATE;
+BEGIN
+    IF to_regclass('attendance_legacy') IS NULL THEN
+        RETURN;
+    END IF;
+
+    SELECT MIN(ses.start_time)::DATE, MAX(ses.start_time)::DATE INTO v_first, v_last
+    FROM attendance_legacy a
+    JOIN Sessions ses ON ses.session_id = a.session_id;
+    IF v_first IS NOT NULL THEN
+        PERFORM ensure_attendance_partitions(v_first, v_last);
+    END IF;
+
+    INSERT INTO Attendance (session_id, student_id, session_start, marked_at)
+    SELECT DISTINCT ON (a.session_id, a.student_id)
+           a.session_id, a.student_id, ses.start_time, a.marked_at
+    FROM attendance_legacy a
+    JOIN Sessions ses ON ses.session_id = a.session_id
+    ORDER BY a.session_id, a.student_id, a.marked_at;
+
+    DROP TABLE attendance_legacy CASCADE;
+END $$;
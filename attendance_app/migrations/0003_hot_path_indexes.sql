@@ -0,0 +1,16 @@
+-- ======================================================
+-- 0003: indexes for the scan and attendance-view queries
+-- ======================================================
+-- Attendance (session_id, student_id, session_start) is already unique (0002).
+
+-- Active-session lookup in mark_attendance()
+CREATE INDEX IF NOT EXISTS sessions_class_active_window_idx
+    ON Sessions (class_id, is_active, start_time, end_time);
+
+-- Student lookup by name in mark_attendance() / get_student_attendance()
+CREATE INDEX IF NOT EXISTS students_name_idx
+    ON Students (name);
+
+-- Class-side access to Enrollments (the primary key leads with student_id)
+CREATE INDEX IF NOT EXISTS enrollments_class_idx
+    ON Enrollments (class_id);
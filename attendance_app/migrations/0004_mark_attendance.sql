@@ -0,0 +1,41 @@
+-- ======================================================
+-- 0004: mark attendance in one round trip
+-- ======================================================
+-- Resolves the student and the active session of the class, then inserts.
+-- Duplicate scans are absorbed by ON CONFLICT DO NOTHING.
+-- Returns one of: 'marked', 'duplicate', 'no_session', 'unknown_student'.
+CREATE OR REPLACE FUNCTION mark_attendance(p_student_name TEXT, p_class_name TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_student_id INT;
+    v_session_id INT;
+    v_session_start TIMESTAMP;
+BEGIN
+    SELECT student_id INTO v_student_id
+    FROM Students
+    WHERE name = p_student_name
+    LIMIT 1;
+    IF v_student_id IS NULL THEN
+        RETURN 'unknown_student';
+    END IF;
+
+    SELECT s.session_id, s.start_time INTO v_session_id, v_session_start
+    FROM Sessions s
+    JOIN Classes c ON s.class_id = c.class_id
+    WHERE c.class_name = p_class_name AND s.is_active = TRUE
+      AND NOW() BETWEEN s.start_time AND s.end_time
+    ORDER BY s.start_time DESC
+    LIMIT 1;
+    IF v_session_id IS NULL THEN
+        RETURN 'no_session';
+    END IF;
+
+    INSERT INTO Attendance (session_id, student_id, session_start, marked_at)
+    VALUES (v_session_id, v_student_id, v_session_start, CURRENT_TIMESTAMP)
+    ON CONFLICT (session_id, student_id, session_start) DO NOTHING;
+    IF FOUND THEN
+        RETURN 'marked';
+    END IF;
+    RETURN 'duplicate';
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,142 @@
+-- ======================================================
+-- 0005: attendance counters (read path for the attendance views)
+-- ======================================================
+-- Per (student, class) attendance and per-class session totals, kept current
+-- by triggers so the attendance views read O(rows returned) instead of
+-- joining and grouping every session and attendance row.
+CREATE TABLE IF NOT EXISTS Attendance_counts (
+    student_id INT NOT NULL,
+    class_id INT NOT NULL,
+    attended INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, class_id),
+    FOREIGN KEY (student_id) REFERENCES Students(student_id),
+    FOREIGN KEY (class_id) REFERENCES Classes(class_id)
+);
+
+CREATE TABLE IF NOT EXISTS Class_session_counts (
+    class_id INT PRIMARY KEY,
+    total_sessions INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (class_id) REFERENCES Classes(class_id)
+);
+
+-- Enrolling a student creates their zeroed counter row
+CREATE OR REPLACE FUNCTION trg_enrollment_counts() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO Attendance_counts (student_id, class_id, attended)
+        VALUES (NEW.student_id, NEW.class_id, 0)
+        ON CONFLICT (student_id, class_id) DO NOTHING;
+    ELSE
+        DELETE FROM Attendance_counts
+        WHERE student_id = OLD.student_id AND class_id = OLD.class_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS enrollment_counts ON Enrollments;
+CREATE TRIGGER enrollment_counts
+AFTER INSERT OR DELETE ON Enrollments
+FOR EACH ROW EXECUTE FUNCTION trg_enrollment_counts();
+
+-- Each attendance row bumps the (student, class) counter of an enrolled student
+CREATE OR REPLACE FUNCTION trg_attendance_counts() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE Attendance_counts ac
+        SET attended = ac.attended + 1
+        FROM Sessions ses
+        WHERE ses.session_id = NEW.session_id
+          AND ac.student_id = NEW.student_id AND ac.class_id = ses.class_id;
+    ELSE
+        UPDATE Attendance_counts ac
+        SET attended = ac.attended - 1
+        FROM Sessions ses
+        WHERE ses.session_id = OLD.session_id
+          AND ac.student_id = OLD.student_id AND ac.class_id = ses.class_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS attendance_counts ON Attendance;
+CREATE TRIGGER attendance_counts
+AFTER INSERT OR DELETE ON Attendance
+FOR EACH ROW EXECUTE FUNCTION trg_attendance_counts();
+
+-- Each scheduled session bumps its class total
+CREATE OR REPLACE FUNCTION trg_session_counts() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO Class_session_counts (class_id, total_sessions)
+        VALUES (NEW.class_id, 1)
+        ON CONFLICT (class_id)
+        DO UPDATE SET total_sessions = Class_session_counts.total_sessions + 1;
+    ELSE
+        UPDATE Class_session_counts
+        SET total_sessions = total_sessions - 1
+        WHERE class_id = OLD.class_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS session_counts ON Sessions;
+CREATE TRIGGER session_counts
+AFTER INSERT OR DELETE ON Sessions
+FOR EACH ROW EXECUTE FUNCTION trg_session_counts();
+
+-- Rows where the counters disagree with the base tables
+CREATE OR REPLACE FUNCTION attendance_counter_drift()
+RETURNS TABLE (kind TEXT, student_id INT, class_id INT, expected INT, actual INT) AS $$
+    WITH expected_att AS (
+        SELECT e.student_id, e.class_id, COUNT(a.attendance_id)::INT AS attended
+        FROM Enrollments e
+        LEFT JOIN Sessions ses ON ses.class_id = e.class_id
+        LEFT JOIN Attendance a ON a.session_id = ses.session_id
+            AND a.student_id = e.student_id
+        GROUP BY e.student_id, e.class_id
+    ),
+    expected_ses AS (
+        SELECT class_id, COUNT(*)::INT AS total_sessions
+        FROM Sessions
+        GROUP BY class_id
+    )
+    SELECT 'attended', COALESCE(x.student_id, ac.student_id),
+           COALESCE(x.class_id, ac.class_id), x.attended, ac.attended
+    FROM expected_att x
+    FULL JOIN Attendance_counts ac
+        ON ac.student_id = x.student_id AND ac.class_id = x.class_id
+    WHERE x.attended IS DISTINCT FROM ac.attended
+    UNION ALL
+    SELECT 'total_sessions', NULL, COALESCE(x.class_id, cs.class_id),
+           x.total_sessions, cs.total_sessions
+    FROM expected_ses x
+    FULL JOIN Class_session_counts cs ON cs.class_id = x.class_id
+    WHERE COALESCE(x.total_sessions, 0) IS DISTINCT FROM cs.total_sessions;
+$$ LANGUAGE sql STABLE;
+
+-- Recompute both counter tables from the base tables
+CREATE OR REPLACE FUNCTION rebuild_attendance_counters() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE Attendance_counts, Class_session_counts IN EXCLUSIVE MODE;
+    DELETE FROM Attendance_counts;
+    DELETE FROM Class_session_counts;
+
+    INSERT INTO Attendance_counts (student_id, class_id, attended)
+    SELECT e.student_id, e.class_id, COUNT(a.attendance_id)
+    FROM Enrollments e
+    LEFT JOIN Sessions ses ON ses.class_id = e.class_id
+    LEFT JOIN Attendance a ON a.session_id = ses.session_id
+        AND a.student_id = e.student_id
+    GROUP BY e.student_id, e.class_id;
+
+    INSERT INTO Class_session_counts (class_id, total_sessions)
+    SELECT class_id, COUNT(*)
+    FROM Sessions
+    GROUP BY class_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Seed the counters from whatever is already in the base tables
+SELECT rebuild_attendance_counters();
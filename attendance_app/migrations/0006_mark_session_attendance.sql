@@ -0,0 +1,41 @@
+-- ======================================================
+-- 0006: mark attendance against a known session
+-- ======================================================
+-- Used when the client already knows the active session (cached by class
+-- name), so the per-scan session lookup is skipped. The session is still
+-- re-checked by primary key, so a stale client cache can never mark a closed
+-- or expired session.
+-- Returns one of: 'marked', 'duplicate', 'no_session', 'unknown_student'.
+CREATE OR REPLACE FUNCTION mark_session_attendance(p_student_name TEXT, p_session_id INT)
+RETURNS TEXT AS $$
+DECLARE
+    v_student_id INT;
+BEGIN
+    SELECT student_id INTO v_student_id
+    FROM Students
+    WHERE name = p_student_name
+    LIMIT 1;
+    IF v_student_id IS NULL THEN
+        RETURN 'unknown_student';
+    END IF;
+
+    INSERT INTO Attendance (session_id, student_id, session_start, marked_at)
+    SELECT s.session_id, v_student_id, s.start_time, CURRENT_TIMESTAMP
+    FROM Sessions s
+    WHERE s.session_id = p_session_id AND s.is_active = TRUE
+      AND NOW() BETWEEN s.start_time AND s.end_time
+    ON CONFLICT (session_id, student_id, session_start) DO NOTHING;
+    IF FOUND THEN
+        RETURN 'marked';
+    END IF;
+
+    PERFORM 1
+    FROM Sessions s
+    WHERE s.session_id = p_session_id AND s.is_active = TRUE
+      AND NOW() BETWEEN s.start_time AND s.end_time;
+    IF FOUND THEN
+        RETURN 'duplicate';
+    END IF;
+    RETURN 'no_session';
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,73 @@
+-- ======================================================
+-- 0007: roster change tracking and marking by student_id
+-- ======================================================
+-- Clients keep the roster in memory and refresh it with
+-- "WHERE updated_at > <last seen>". Enrollment changes touch the student row
+-- so they are picked up by the same watermark.
+
+ALTER TABLE Students
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS students_updated_at_idx
+    ON Students (updated_at);
+
+CREATE OR REPLACE FUNCTION trg_students_touch() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS students_touch ON Students;
+CREATE TRIGGER students_touch
+BEFORE UPDATE ON Students
+FOR EACH ROW EXECUTE FUNCTION trg_students_touch();
+
+CREATE OR REPLACE FUNCTION trg_enrollment_touch_student() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE Students SET updated_at = clock_timestamp() WHERE student_id = NEW.student_id;
+    ELSE
+        UPDATE Students SET updated_at = clock_timestamp() WHERE student_id = OLD.student_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS enrollment_touch_student ON Enrollments;
+CREATE TRIGGER enrollment_touch_student
+AFTER INSERT OR DELETE ON Enrollments
+FOR EACH ROW EXECUTE FUNCTION trg_enrollment_touch_student();
+
+-- The client now resolves students from its roster, so marks are keyed by
+-- student_id instead of the (not unique) student name.
+DROP FUNCTION IF EXISTS mark_session_attendance(TEXT, INT);
+
+CREATE OR REPLACE FUNCTION mark_session_attendance(p_student_id INT, p_session_id INT)
+RETURNS TEXT AS $$
+BEGIN
+    PERFORM 1 FROM Students WHERE student_id = p_student_id;
+    IF NOT FOUND THEN
+        RETURN 'unknown_student';
+    END IF;
+
+    INSERT INTO Attendance (session_id, student_id, session_start, marked_at)
+    SELECT s.session_id, p_student_id, s.start_time, CURRENT_TIMESTAMP
+    FROM Sessions s
+    WHERE s.session_id = p_session_id AND s.is_active = TRUE
+      AND NOW() BETWEEN s.start_time AND s.end_time
+    ON CONFLICT (session_id, student_id, session_start) DO NOTHING;
+    IF FOUND THEN
+        RETURN 'marked';
+    END IF;
+
+    PERFORM 1
+    FROM Sessions s
+    WHERE s.session_id = p_session_id AND s.is_active = TRUE
+      AND NOW() BETWEEN s.start_time AND s.end_time;
+    IF FOUND THEN
+        RETURN 'duplicate';
+    END IF;
+    RETURN 'no_session';
+END;
+$$ LANGUAGE plpgsql;
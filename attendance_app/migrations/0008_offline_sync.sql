@@ -0,0 +1,65 @@
+-- ======================================================
+-- 0008: idempotent upload of marks journaled on the device
+-- ======================================================
+-- Clients commit scans to a local journal first and upload them in batches
+-- (utils/journal.py). Every mark carries (device_id, mark_id): the first
+-- upload records its result in Synced_marks, and a retried upload gets that
+-- result back instead of marking again.
+--
+-- The session is checked against the scan time rather than NOW(), so marks
+-- taken while the database was unreachable still count once they arrive.
+-- close_session() cuts end_time to the closing time, so the time window
+-- alone rejects scans taken after a session was closed. Scan times in the
+-- future (client clock ahead) are clamped to now.
+-- Returns one of: 'marked', 'duplicate', 'no_session', 'unknown_student'.
+
+CREATE TABLE IF NOT EXISTS Synced_marks (
+    device_id  TEXT NOT NULL,
+    mark_id    BIGINT NOT NULL,
+    status     TEXT NOT NULL,
+    synced_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (device_id, mark_id)
+);
+
+CREATE OR REPLACE FUNCTION sync_offline_mark(p_device_id TEXT, p_mark_id BIGINT,
+                                             p_student_id INT, p_session_id INT,
+                                             p_scanned_at TIMESTAMP)
+RETURNS TEXT AS $$
+DECLARE
+    v_status TEXT;
+    v_at TIMESTAMP := LEAST(p_scanned_at, LOCALTIMESTAMP);
+BEGIN
+    SELECT status INTO v_status
+    FROM Synced_marks
+    WHERE device_id = p_device_id AND mark_id = p_mark_id;
+    IF FOUND THEN
+        RETURN v_status;
+    END IF;
+
+    PERFORM 1 FROM Students WHERE student_id = p_student_id;
+    IF NOT FOUND THEN
+        v_status := 'unknown_student';
+    ELSE
+        INSERT INTO Attendance (session_id, student_id, session_start, marked_at)
+        SELECT s.session_id, p_student_id, s.start_time, v_at
+        FROM Sessions s
+        WHERE s.session_id = p_session_id
+          AND v_at BETWEEN s.start_time AND s.end_time
+        ON CONFLICT (session_id, student_id, session_start) DO NOTHING;
+        IF FOUND THEN
+            v_status := 'marked';
+        ELSE
+            PERFORM 1
+            FROM Sessions s
+            WHERE s.session_id = p_session_id
+              AND v_at BETWEEN s.start_time AND s.end_time;
+            v_status := CASE WHEN FOUND THEN 'duplicate' ELSE 'no_session' END;
+        END IF;
+    END IF;
+
+    INSERT INTO Synced_marks (device_id, mark_id, status)
+    VALUES (p_device_id, p_mark_id, v_status)
+    ON CONFLICT (device_id, mark_id) DO NOTHING;
+    RETURN v_status;
+END;
+$$ LANGUAGE plpgsql;
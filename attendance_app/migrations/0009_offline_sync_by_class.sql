@@ -0,0 +1,85 @@
+-- ======================================================
+-- 0009: resolve offline marks by class and scan time; prune Synced_marks
+-- ======================================================
+-- A device that cannot reach the database journals the class name and the
+-- scan time, not a session_id. The session is resolved here, as the session
+-- of that class whose window contains the scan time, so a mark uploaded
+-- after its session ended (or after the next one started) still lands on
+-- the session it was scanned in. A session_id known at scan time (signed
+-- session code, warm cache) is used as before.
+--
+-- Synced_marks only has to outlive a device's retries of the same batch,
+-- so prune_synced_marks() drops entries older than the given age. The
+-- journal's syncer calls it after uploading.
+
+CREATE INDEX IF NOT EXISTS synced_marks_synced_at ON Synced_marks (synced_at);
+
+DROP FUNCTION IF EXISTS sync_offline_mark(TEXT, BIGINT, INT, INT, TIMESTAMP);
+
+CREATE OR REPLACE FUNCTION sync_offline_mark(p_device_id TEXT, p_mark_id BIGINT,
+                                             p_student_id INT, p_class_name TEXT,
+                                             p_session_id INT, p_scanned_at TIMESTAMP)
+RETURNS TEXT AS $$
+DECLARE
+    v_status TEXT;
+    v_session_id INT := p_session_id;
+    v_at TIMESTAMP := LEAST(p_scanned_at, LOCALTIMESTAMP);
+BEGIN
+    SELECT status INTO v_status
+    FROM Synced_marks
+    WHERE device_id = p_device_id AND mark_id = p_mark_id;
+    IF FOUND THEN
+        RETURN v_status;
+    END IF;
+
+    IF v_session_id IS NULL THEN
+        SELECT s.session_id INTO v_session_id
+        FROM Sessions s
+        JOIN Classes c ON s.class_id = c.class_id
+        WHERE c.class_name = p_class_name
+          AND v_at BETWEEN s.start_time AND s.end_time
+        ORDER BY s.start_time DESC
+        LIMIT 1;
+    END IF;
+
+    PERFORM 1 FROM Students WHERE student_id = p_student_id;
+    IF NOT FOUND THEN
+        v_status := 'unknown_student';
+    ELSIF v_session_id IS NULL THEN
+        v_status := 'no_session';
+    ELSE
+        INSERT INTO Attendance (session_id, student_id, session_start, marked_at)
+        SELECT s.session_id, p_student_id, s.start_time, v_at
+        FROM Sessions s
+        WHERE s.session_id = v_session_id
+          AND v_at BETWEEN s.start_time AND s.end_time
+        ON CONFLICT (session_id, student_id, session_start) DO NOTHING;
+        IF FOUND THEN
+            v_status := 'marked';
+        ELSE
+            PERFORM 1
+            FROM Sessions s
+            WHERE s.session_id = v_session_id
+              AND v_at BETWEEN s.start_time AND s.end_time;
+            v_status := CASE WHEN FOUND THEN 'duplicate' ELSE 'no_session' END;
+        END IF;
+    END IF;
+
+    INSERT INTO Synced_marks (device_id, mark_id, status)
+    VALUES (p_device_id, p_mark_id, v_status)
+    ON CONFLICT (device_id, mark_id) DO NOTHING;
+    RETURN v_status;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Returns the number of entries removed.
+CREATE OR REPLACE FUNCTION prune_synced_marks(p_older_than INTERVAL)
+RETURNS INT AS $$
+DECLARE
+    v_deleted INT;
+BEGIN
+    DELETE FROM Synced_marks WHERE synced_at < LOCALTIMESTAMP - p_older_than;
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
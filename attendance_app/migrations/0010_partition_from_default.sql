@@ -0,0 +1,47 @@
+-- ======================================================
+-- 0010: move rows out of attendance_default when adding a partition
+-- ======================================================
+-- Marks for a month without a partition land in attendance_default. Once
+-- that has happened, CREATE TABLE ... PARTITION OF for the month fails,
+-- because the default partition already holds rows in its range. The
+-- partition is now built as a plain table, the month's rows are moved into
+-- it from the default partition, and it is attached afterwards.
+-- attendance_default is locked for the move so no new rows slip in between.
+-- Deleting from attendance_default fires the attendance_counts trigger but
+-- the copy into the new table does not, so the counters are added back.
+
+CREATE OR REPLACE FUNCTION ensure_attendance_partition(p_month DATE) RETURNS VOID AS $$
+DECLARE
+    v_start DATE := date_trunc('month', p_month)::DATE;
+    v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    v_name TEXT := 'attendance_' || to_char(v_start, 'YYYY_MM');
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE attendance_default IN ACCESS EXCLUSIVE MODE;
+    EXECUTE format('CREATE TABLE %I (LIKE Attendance INCLUDING DEFAULTS)', v_name);
+    EXECUTE format(
+        'WITH moved AS ('
+        '    DELETE FROM attendance_default'
+        '    WHERE session_start >= %L AND session_start < %L'
+        '    RETURNING *'
+        ') INSERT INTO %I SELECT * FROM moved',
+        v_start, v_end, v_name
+    );
+    EXECUTE format(
+        'UPDATE Attendance_counts ac SET attended = ac.attended + moved.marks'
+        ' FROM (SELECT a.student_id, ses.class_id, COUNT(*) AS marks'
+        '       FROM %I a JOIN Sessions ses ON ses.session_id = a.session_id'
+        '       GROUP BY a.student_id, ses.class_id) moved'
+        ' WHERE ac.student_id = moved.student_id AND ac.class_id = moved.class_id',
+        v_name
+    );
+    -- indexes, the primary key and foreign keys are added on attach
+    EXECUTE format(
+        'ALTER TABLE Attendance ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        v_name, v_start, v_end
+    );
+END;
+$$ LANGUAGE plpgsql;
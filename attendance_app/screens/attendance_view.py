@@ -1,13 +1,13 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.app import App
 from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 
+from screens.table_view import TableView
+
 
 class AttendanceViewScreen(Screen):
     """
@@ -33,12 +33,9 @@ class AttendanceViewScreen(Screen):
         )
         self.container.add_widget(self.title)
         
-        # Scrollable content
-        self.scroll = ScrollView(size_hint=(1, 0.8))
-        self.grid = GridLayout(cols=1, size_hint_y=None, spacing=(0, 10))
-        self.grid.bind(minimum_height=self.grid.setter('height'))
-        self.scroll.add_widget(self.grid)
-        self.container.add_widget(self.scroll)
+        # Scrollable content; rows are recycled, not one widget tree per row
+        self.table = TableView(["Student", "Subject", "Attendance Count"], size_hint=(1, 0.8))
+        self.container.add_widget(self.table)
         
         # Back button
         back_btn = Button(
@@ -60,66 +57,28 @@ class AttendanceViewScreen(Screen):
 
     def populate_from_database(self, attendance_data):
         """
-        Create a grid layout showing attendance data from database.
+        Show attendance data from the database.
         attendance_data should be a list of tuples (student_name, subject_name, attendance_count)
         """
-        self.grid.clear_widgets()
-        
-        # Create header
-        header_layout = GridLayout(
-            cols=3,  # student, subject, count
-            size_hint_y=None,
-            height=40,
-            spacing=(10, 0)
-        )
-        
-        headers = ["Student", "Subject", "Attendance Count"]
-        for header in headers:
-            header_layout.add_widget(
-                Label(
-                    text=header,
-                    color=(0, 0, 0, 1),
-                    font_size='16sp',
-                    bold=True
-                )
-            )
-        self.grid.add_widget(header_layout)
+        self.show_all_classes()
+        self.table.set_rows(attendance_data)
+
+    def clear(self):
+        self.table.set_rows([])
+
+    def show_all_classes(self):
+        """Long format: one row per student and class."""
+        self.title.text = "Class Attendance Overview"
+        self.table.set_headers(["Student", "Subject", "Attendance Count"])
+        self.clear()
+
+    def show_classes(self, class_names):
+        """Pivoted rows from iter_class_attendance(): one row per student."""
+        self.title.text = f"Attendance - {', '.join(class_names)}"
+        per_class = list(class_names) if len(class_names) > 1 else []
+        self.table.set_headers(["Roll No", "Student"] + per_class + ["Attended", "Held", "%"])
+        self.clear()
 
-        # Create rows for attendance data
-        current_student = None
-        for student_name, subject_name, count in attendance_data:
-            row_layout = GridLayout(
-                cols=3,
-                size_hint_y=None,
-                height=35,
-                spacing=(10, 0)
-            )
-            
-            # Add student name
-            row_layout.add_widget(
-                Label(
-                    text=str(student_name),
-                    color=(0, 0, 0, 1),
-                    font_size='14sp'
-                )
-            )
-            
-            # Add subject name
-            row_layout.add_widget(
-                Label(
-                    text=str(subject_name),
-                    color=(0, 0, 0, 1),
-                    font_size='14sp'
-                )
-            )
-            
-            # Add attendance count
-            row_layout.add_widget(
-                Label(
-                    text=str(count),
-                    color=(0, 0, 0, 1),
-                    font_size='14sp'
-                )
-            )
-            
-            self.grid.add_widget(row_layout)
+    def append_from_database(self, rows):
+        """Append one streamed batch of rows matching the current headers."""
+        self.table.append_rows(rows)
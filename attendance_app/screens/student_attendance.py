@@ -1,4 +1,3 @@
-import pandas as pd
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -9,8 +8,6 @@ from kivy.app import App
 from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 
-from utils.helpers import get_student_attendance
-
 class StudentAttendanceScreen(Screen):
     """
     Screen to display a single student's attendance as two-column grid (subject, value)
@@ -60,13 +57,14 @@ class StudentAttendanceScreen(Screen):
         self.bg_rect.size = self.size
         self.bg_rect.pos = self.pos
 
-    def populate_for_student(self, student_name):
-        """Get attendance from database and populate grid"""
+    def populate_for_student(self, student_name, attendance_data):
+        """
+        Populate grid from attendance rows already fetched from the database.
+        attendance_data should be a list of tuples (subject_name, attendance_count)
+        """
         self.grid.clear_widgets()
         self.grid.spacing = (0, 20)
         try:
-            attendance_data = get_student_attendance(student_name)
-            
             # Add headers
             subject_header = Label(
                 text="Subject",
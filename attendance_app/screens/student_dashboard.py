@@ -5,13 +5,15 @@ from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 from kivy.app import App
 
+from utils.assets import background_texture
+
 class StudentDashboardScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         # --- Background image ---
         with self.canvas.before:
-            self.bg_rect = Rectangle(source="b3.png", size=self.size, pos=self.pos)
+            self.bg_rect = Rectangle(texture=background_texture("b3.png"), size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
 
         # --- Heading ---
@@ -56,13 +58,28 @@ class StudentDashboardScreen(Screen):
         self.view_attendance_btn.bind(on_press=lambda inst: App.get_running_app().show_student_attendance_screen())
         self.add_widget(self.view_attendance_btn)
 
+        # --- My QR Code Button (for kiosk check-in) ---
+        self.my_qr_btn = Button(
+            text="My QR Code",
+            font_size=20,
+            size_hint=(None, None),
+            size=(320, 60),
+            pos_hint={"center_x": 0.5, "top": 0.49},
+            background_color=get_color_from_hex("#579b7aff"),
+            color=get_color_from_hex("#ffffffff"),
+            bold=True,
+            background_normal=""
+        )
+        self.my_qr_btn.bind(on_press=lambda inst: App.get_running_app().show_student_qr())
+        self.add_widget(self.my_qr_btn)
+
         # --- Logout Button ---
         self.back_btn = Button(
             text="Logout",
             font_size=20,
             size_hint=(None, None),
             size=(320, 60),
-            pos_hint={"center_x": 0.5, "top": 0.49},
+            pos_hint={"center_x": 0.5, "top": 0.36},
             background_color=get_color_from_hex("#adb5bdff"),
             color=get_color_from_hex("#22223bff"),
             bold=True,
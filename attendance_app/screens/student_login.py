@@ -6,6 +6,8 @@ from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 from kivy.app import App
 
+from utils.assets import background_texture
+
 
 class StudentLoginScreen(Screen):
     def __init__(self, **kwargs):
@@ -13,7 +15,7 @@ class StudentLoginScreen(Screen):
 
         # --- Background image ---
         with self.canvas.before:
-            self.bg_rect = Rectangle(source="b4.png", size=self.size, pos=self.pos)
+            self.bg_rect = Rectangle(texture=background_texture("b4.png"), size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
 
         # --- Heading ---
@@ -0,0 +1,72 @@
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.properties import ListProperty, StringProperty
+
+from utils.assets import font_name
+
+
+class TableRow(BoxLayout):
+    """
+    One reusable row of a TableView. RecycleView sets `cells` from the data
+    entry being shown, and the row rewrites its labels' text in place.
+    """
+    cells = ListProperty()
+    color = ListProperty([0, 0, 0, 1])
+    font_size = StringProperty("14sp")
+
+    def __init__(self, **kwargs):
+        super().__init__(spacing=10, **kwargs)
+        self.labels = []
+        self.bind(cells=self._update_cells)
+
+    def _update_cells(self, instance, cells):
+        while len(self.labels) < len(cells):
+            label = Label(color=self.color, font_size=self.font_size, font_name=font_name())
+            self.labels.append(label)
+            self.add_widget(label)
+        while len(self.labels) > len(cells):
+            self.remove_widget(self.labels.pop())
+        for label, value in zip(self.labels, cells):
+            label.text = value
+
+
+class TableView(BoxLayout):
+    """
+    Header row plus a virtualized body: only the rows in view exist as
+    widgets and are reused while scrolling, so the widget count stays the
+    same whether the table has ten rows or twenty thousand.
+    """
+    def __init__(self, headers, row_height=35, header_height=40, **kwargs):
+        super().__init__(orientation="vertical", **kwargs)
+
+        self.header = BoxLayout(size_hint_y=None, height=header_height, spacing=10)
+        self.set_headers(headers)
+        self.add_widget(self.header)
+
+        self.body = RecycleView(viewclass=TableRow)
+        layout = RecycleBoxLayout(
+            orientation="vertical",
+            default_size=(None, row_height),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+        )
+        layout.bind(minimum_height=layout.setter("height"))
+        self.body.add_widget(layout)
+        self.add_widget(self.body)
+
+    def set_headers(self, headers):
+        self.header.clear_widgets()
+        for text in headers:
+            self.header.add_widget(Label(text=text, color=(0, 0, 0, 1), font_size='16sp', bold=True,
+                                         font_name=font_name()))
+
+    def append_rows(self, rows):
+        """Add rows at the end without touching the ones already shown."""
+        self.body.data.extend([{"cells": [str(value) for value in row]} for row in rows])
+
+    def set_rows(self, rows):
+        """Replace the table contents; rows are sequences of cell values."""
+        self.body.data = [{"cells": [str(value) for value in row]} for row in rows]
+        self.body.scroll_y = 1
@@ -6,6 +6,8 @@ from kivy.graphics import Rectangle
 from kivy.utils import get_color_from_hex
 from kivy.app import App
 
+from utils.assets import background_texture
+
 
 class TeacherDashboardScreen(Screen):
     def __init__(self, **kwargs):
@@ -13,7 +15,7 @@ class TeacherDashboardScreen(Screen):
 
         # --- Background image ---
         with self.canvas.before:
-            self.bg_rect = Rectangle(source="b5.png", size=self.size, pos=self.pos)
+            self.bg_rect = Rectangle(texture=background_texture("b5.png"), size=self.size, pos=self.pos)
         self.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
 
         # --- Heading ---
@@ -66,13 +68,28 @@ class TeacherDashboardScreen(Screen):
         view_attendance_btn.bind(on_press=lambda inst: App.get_running_app().show_teacher_attendance_screen())
         self.add_widget(view_attendance_btn)
 
+        # --- Kiosk Check-in Button ---
+        kiosk_btn = Button(
+            text="Kiosk Check-in",
+            font_size=20,
+            size_hint=(None, None),
+            size=(320, 60),
+            pos_hint={"center_x": 0.5, "top": 0.29},
+            background_color=get_color_from_hex("#62AFE2FF"),
+            color=get_color_from_hex("#ffffffff"),
+            bold=True,
+            background_normal=""
+        )
+        kiosk_btn.bind(on_press=lambda inst: App.get_running_app().start_kiosk_thread())
+        self.add_widget(kiosk_btn)
+
         # --- Logout Button ---
         back_btn = Button(
             text="Logout",
             font_size=20,
             size_hint=(None, None),
             size=(320, 60),
-            pos_hint={"center_x": 0.5, "top": 0.29},
+            pos_hint={"center_x": 0.5, "top": 0.16},
             background_color=get_color_from_hex("#adb5bdff"),
             color=get_color_from_hex("#22223bff"),
             bold=True,
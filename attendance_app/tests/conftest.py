@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the app imports its packages as top-level modules (`from utils.helpers import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,150 @@
+"""
+Server-side pieces (counter triggers, partition helpers, offline sync) run
+against a scratch database on the server in ATTENDANCE_TEST_DSN, e.g.
+ATTENDANCE_TEST_DSN="host=localhost user=postgres". Skipped without it.
+"""
+import os
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.extensions import make_dsn  # noqa: E402
+
+from utils.migrations import migrate  # noqa: E402
+
+TEST_DB = "attendance_test"
+ADMIN_DSN = os.environ.get("ATTENDANCE_TEST_DSN")
+
+pytestmark = pytest.mark.skipif(not ADMIN_DSN, reason="ATTENDANCE_TEST_DSN is not set")
+
+
+def _admin(statement):
+    conn = psycopg2.connect(ADMIN_DSN)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(statement)
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="module")
+def dsn():
+    _admin(f"DROP DATABASE IF EXISTS {TEST_DB}")
+    _admin(f"CREATE DATABASE {TEST_DB}")
+    dsn = make_dsn(ADMIN_DSN, dbname=TEST_DB)
+    conn = psycopg2.connect(dsn)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+    yield dsn
+    _admin(f"DROP DATABASE IF EXISTS {TEST_DB}")
+
+
+@pytest.fixture
+def cur(dsn):
+    """A cursor whose changes are rolled back after the test."""
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO Teachers (name, email, password_hash) VALUES ('T', 't@test.invalid', 'x');
+                INSERT INTO Classes (class_name, teacher_id) SELECT 'DMS', MIN(teacher_id) FROM Teachers;
+                INSERT INTO Students (name, roll_no, email, password_hash)
+                VALUES ('Arin', '21CS001', 'a@test.invalid', 'x');
+                INSERT INTO Enrollments (student_id, class_id)
+                SELECT s.student_id, c.class_id FROM Students s, Classes c;
+            """)
+            yield cur
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def add_session(cur, start_offset, minutes=60):
+    cur.execute("""
+        INSERT INTO Sessions (class_id, start_time, end_time)
+        SELECT class_id, LOCALTIMESTAMP + %s * INTERVAL '1 minute',
+               LOCALTIMESTAMP + (%s + %s) * INTERVAL '1 minute'
+        FROM Classes WHERE class_name = 'DMS'
+        RETURNING session_id
+    """, (start_offset, start_offset, minutes))
+    return cur.fetchone()[0]
+
+
+def student_id(cur):
+    cur.execute("SELECT student_id FROM Students WHERE roll_no = '21CS001'")
+    return cur.fetchone()[0]
+
+
+def attended(cur):
+    cur.execute("SELECT attended FROM Attendance_counts")
+    return cur.fetchone()[0]
+
+
+def test_counters_follow_marks(cur):
+    session_id = add_session(cur, -10)
+    assert attended(cur) == 0
+    cur.execute("SELECT mark_session_attendance(%s, %s)", (student_id(cur), session_id))
+    assert cur.fetchone()[0] == "marked"
+    assert attended(cur) == 1
+    cur.execute("DELETE FROM Attendance")
+    assert attended(cur) == 0
+    cur.execute("SELECT * FROM attendance_counter_drift()")
+    assert cur.fetchall() == []
+
+
+def test_rebuild_matches_triggers(cur):
+    add_session(cur, -10)
+    add_session(cur, 24 * 60)
+    cur.execute("SELECT total_sessions FROM Class_session_counts")
+    before = cur.fetchall()
+    cur.execute("SELECT rebuild_attendance_counters()")
+    cur.execute("SELECT total_sessions FROM Class_session_counts")
+    assert cur.fetchall() == before
+    cur.execute("SELECT * FROM attendance_counter_drift()")
+    assert cur.fetchall() == []
+
+
+def test_partition_takes_over_rows_from_default(cur):
+    session_id = add_session(cur, -10)
+    cur.execute("UPDATE Sessions SET start_time = '2001-01-15', end_time = '2001-01-15 01:00'")
+    cur.execute("""
+        INSERT INTO Attendance (session_id, student_id, session_start)
+        VALUES (%s, %s, '2001-01-15')
+    """, (session_id, student_id(cur)))
+    cur.execute("SELECT COUNT(*) FROM attendance_default")
+    assert cur.fetchone()[0] == 1
+
+    cur.execute("SELECT ensure_attendance_partition('2001-01-01')")
+    cur.execute("SELECT COUNT(*) FROM attendance_default")
+    assert cur.fetchone()[0] == 0
+    cur.execute("SELECT COUNT(*) FROM attendance_2001_01")
+    assert cur.fetchone()[0] == 1
+    assert attended(cur) == 1
+
+
+def test_offline_mark_resolves_session_by_scan_time(cur):
+    earlier = add_session(cur, -120)
+    add_session(cur, -10)
+    args = ("device", 1, student_id(cur), "DMS", None)
+    cur.execute("SELECT sync_offline_mark(%s, %s, %s, %s, %s, LOCALTIMESTAMP - INTERVAL '90 minutes')", args)
+    assert cur.fetchone()[0] == "marked"
+    cur.execute("SELECT session_id FROM Attendance")
+    assert cur.fetchone()[0] == earlier
+    # a retried upload gets the first result back
+    cur.execute("SELECT sync_offline_mark(%s, %s, %s, %s, %s, LOCALTIMESTAMP)", args)
+    assert cur.fetchone()[0] == "marked"
+
+
+def test_prune_synced_marks(cur):
+    cur.execute("""
+        INSERT INTO Synced_marks (device_id, mark_id, status, synced_at)
+        VALUES ('device', 1, 'marked', LOCALTIMESTAMP - INTERVAL '8 days'),
+               ('device', 2, 'marked', LOCALTIMESTAMP)
+    """)
+    cur.execute("SELECT prune_synced_marks(INTERVAL '7 days')")
+    assert cur.fetchone()[0] == 1
+    cur.execute("SELECT mark_id FROM Synced_marks")
+    assert cur.fetchall() == [(2,)]
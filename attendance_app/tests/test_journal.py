@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from utils.helpers import MARK_DUPLICATE, MARK_MARKED, MARK_NO_SESSION, MARK_QUEUED  # noqa: E402
+from utils.journal import AttendanceJournal, CircuitBreaker  # noqa: E402
+
+
+class RecordingJournal(AttendanceJournal):
+    """Uploads go to a list instead of PostgreSQL."""
+    def __init__(self, *args, statuses=None, **kwargs):
+        self.uploaded = []
+        self.statuses = statuses or {}
+        super().__init__(*args, **kwargs)
+
+    def _upload(self, rows):
+        self.uploaded.extend(rows)
+        return {row[0]: self.statuses.get(row[0], MARK_MARKED) for row in rows}
+
+    def _prune_server(self):
+        pass
+
+
+@pytest.fixture
+def journal(tmp_path):
+    invalidated = []
+    j = RecordingJournal(str(tmp_path / "journal.db"), connection_factory=None,
+                         invalidate_session=invalidated.append, statuses={2: MARK_NO_SESSION})
+    j.invalidated = invalidated
+    yield j
+    j.close(timeout=2)
+
+
+def journal_rows(journal):
+    db = sqlite3.connect(journal.path)
+    try:
+        return db.execute("SELECT mark_id, student_id, subject, session_id, status "
+                          "FROM marks ORDER BY mark_id").fetchall()
+    finally:
+        db.close()
+
+
+def test_submit_is_acknowledged_before_upload(journal):
+    assert journal.submit(1, "DMS", session_id=7).result(0) == MARK_QUEUED
+    assert journal.submit(1, "DMS", session_id=7).result(0) == MARK_DUPLICATE
+
+
+def test_unknown_session_is_journaled_with_class_and_time(journal):
+    journal.submit(1, "DMS")
+    journal.submit(2, "DMS")
+    journal.close(timeout=2)
+    # the session is left to the server, which matches it by scanned_at
+    assert [(row[1], row[2], row[3]) for row in journal.uploaded] == [(1, "DMS", None), (2, "DMS", None)]
+    assert all(row[4] > 0 for row in journal.uploaded)
+    assert [row[4] for row in journal_rows(journal)] == [MARK_MARKED, MARK_NO_SESSION]
+    assert journal.invalidated == ["DMS"]
+
+
+def test_breaker_opens_then_half_opens():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert not breaker.allow() and breaker.retry_in() == 10
+    now[0] = 10
+    assert breaker.state == "half_open"
+    breaker.record_failure()        # the trial call failed
+    assert breaker.state == "open"
+    now[0] = 20
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
@@ -0,0 +1,101 @@
+from collections import namedtuple
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from utils.helpers import MARK_DUPLICATE, MARK_ERROR, MARK_MARKED, MARK_QUEUED  # noqa: E402
+from utils.kiosk import KioskSession, SlidingWindowDeduper, parse_student_payload  # noqa: E402
+
+# the shape of utils.scanner.Detection, without importing cv2
+Detection = namedtuple("Detection", "data rect")
+
+
+class Student:
+    def __init__(self, student_id, name):
+        self.student_id = student_id
+        self.name = name
+
+
+ROSTER = {"21CS001": Student(1, "Arin"), "21CS002": Student(2, "Gatik")}
+
+
+class ManualSubmit:
+    """Records submits; the test decides when and how each one completes."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, student_id, class_id, callback=None, session_id=None):
+        self.calls.append((student_id, class_id, session_id, callback))
+
+    def complete(self, index, status):
+        self.calls[index][3](status)
+
+
+def scan(*roll_numbers):
+    return [Detection(f"STU:{roll}", None) for roll in roll_numbers]
+
+
+@pytest.fixture
+def submit():
+    return ManualSubmit()
+
+
+@pytest.fixture
+def kiosk(submit):
+    return KioskSession("DMS", 7, ROSTER.get, submit, window_seconds=300)
+
+
+def test_parse_student_payload():
+    assert parse_student_payload("STU:21CS001") == "21CS001"
+    assert parse_student_payload("STU:  ") is None
+    assert parse_student_payload("DMS") is None
+
+
+def test_deduper_window():
+    now = [0.0]
+    deduper = SlidingWindowDeduper(10, clock=lambda: now[0])
+    assert not deduper.seen("a")
+    assert not deduper.seen("a")      # checking does not record
+    deduper.record("a")
+    assert deduper.seen("a")
+    now[0] = 11
+    assert not deduper.seen("a")
+
+
+def test_student_in_flight_is_submitted_once(kiosk, submit):
+    kiosk.handle(scan("21CS001"))
+    kiosk.handle(scan("21CS001", "21CS001"))
+    assert [c[:3] for c in submit.calls] == [(1, "DMS", 7)]
+
+
+def test_success_is_deduped_for_the_window(kiosk, submit):
+    kiosk.handle(scan("21CS001"))
+    submit.complete(0, MARK_QUEUED)
+    kiosk.handle(scan("21CS001"))
+    assert len(submit.calls) == 1
+    assert kiosk.counts[MARK_MARKED] == 1
+    assert kiosk.last_marked == "Arin"
+
+
+def test_duplicate_is_final(kiosk, submit):
+    kiosk.handle(scan("21CS002"))
+    submit.complete(0, MARK_DUPLICATE)
+    kiosk.handle(scan("21CS002"))
+    assert len(submit.calls) == 1
+    assert kiosk.counts[MARK_DUPLICATE] == 1
+
+
+def test_failed_mark_is_retried(kiosk, submit):
+    kiosk.handle(scan("21CS001"))
+    submit.complete(0, MARK_ERROR)
+    kiosk.handle(scan("21CS001"))
+    assert len(submit.calls) == 2
+    assert kiosk.counts["rejected"] == 1
+
+
+def test_unknown_student_counted_once(kiosk, submit):
+    kiosk.handle(scan("99XX999"))
+    kiosk.handle(scan("99XX999"))
+    assert submit.calls == []
+    assert kiosk.counts["rejected"] == 1
@@ -0,0 +1,85 @@
+import pytest
+
+from utils.migrations import (
+    MIGRATIONS_DIR,
+    MigrationError,
+    discover_migrations,
+    ensure_partitions,
+    hash_legacy_passwords,
+)
+from utils.roster import verify_password
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((" ".join(sql.split()), params))
+
+    def fetchone(self):
+        return (self.conn.regproc,)
+
+    def fetchall(self):
+        return self.conn.rows
+
+
+class FakeConnection:
+    def __init__(self, regproc=None, rows=()):
+        self.regproc = regproc
+        self.rows = list(rows)
+        self.executed = []
+        self.commits = self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_bundled_migrations_are_numbered_in_order():
+    versions = [m.version for m in discover_migrations(MIGRATIONS_DIR)]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    for name in ("0001_a.sql", "0001_b.sql"):
+        (tmp_path / name).write_text("SELECT 1;")
+    (tmp_path / "notes.txt").write_text("")
+    with pytest.raises(MigrationError):
+        discover_migrations(str(tmp_path))
+
+
+def test_ensure_partitions_creates_months_ahead():
+    conn = FakeConnection("ensure_attendance_partitions")
+    assert ensure_partitions(conn, months_ahead=2)
+    sql, params = conn.executed[-1]
+    assert sql.startswith("SELECT ensure_attendance_partitions(CURRENT_DATE,")
+    assert params == (2,)
+    assert conn.commits == 1
+
+
+def test_ensure_partitions_skips_unpartitioned_schema():
+    conn = FakeConnection(None)
+    assert not ensure_partitions(conn)
+    assert len(conn.executed) == 1 and conn.rollbacks == 1
+
+
+def test_hash_legacy_passwords():
+    conn = FakeConnection(rows=[(1, "secret"), (2, "hunter2")])
+    assert hash_legacy_passwords(conn) == 2
+    updates = [params for sql, params in conn.executed if sql.startswith("UPDATE Students")]
+    assert [student_id for _, student_id in updates] == [1, 2]
+    assert verify_password("secret", updates[0][0])
+    assert verify_password("hunter2", updates[1][0])
+    assert conn.commits == 1
@@ -0,0 +1,17 @@
+from utils.roster import hash_password, verify_password
+
+
+def test_hash_round_trip():
+    stored = hash_password("s3cret", iterations=1000)
+    assert stored.startswith("pbkdf2_sha256$1000$")
+    assert verify_password("s3cret", stored)
+    assert not verify_password("s3cret ", stored)
+
+
+def test_salts_differ():
+    assert hash_password("s3cret", iterations=1000) != hash_password("s3cret", iterations=1000)
+
+
+def test_plain_text_rows_are_rejected():
+    # tools/migrate.py hashes these; a plain value is never a valid password
+    assert not verify_password("s3cret", "s3cret")
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("pyzbar.pyzbar")
+
+from utils.scanner import Detection, ScanPipeline  # noqa: E402
+
+
+class FrameCounter:
+    """Capture stand-in that yields `frames` integer 'frames' and then ends."""
+    def __init__(self, frames):
+        self.frames = frames
+        self.count = 0
+
+    def read(self):
+        if self.count >= self.frames:
+            return False, None
+        self.count += 1
+        return True, self.count
+
+    def release(self):
+        pass
+
+
+class EveryFrameScanner:
+    def scan(self, frame):
+        return [Detection(f"STU:{frame}", None)]
+
+
+def test_results_queue_is_bounded_and_keeps_the_newest():
+    pipeline = ScanPipeline(FrameCounter(200), EveryFrameScanner, max_capture_fps=0,
+                            max_decode_fps=0, results_size=4, buffer_size=200)
+    pipeline.start()
+    pipeline.capture_ended.wait(5)
+    pipeline.stop()
+    assert pipeline.results.qsize() <= 4
+    kept = []
+    while not pipeline.results.empty():
+        kept.append(pipeline.results.get_nowait())
+    assert kept and pipeline.results_dropped > 0
+    assert kept == sorted(kept, key=lambda d: int(d[0].data[4:]))
@@ -0,0 +1,80 @@
+import pytest
+
+from utils.session_tokens import (
+    ExpiredToken,
+    InvalidToken,
+    MissingSecret,
+    SessionTokenSigner,
+    is_session_token,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def signer(clock):
+    return SessionTokenSigner("test-secret", ttl_seconds=30, skew_seconds=5, clock=clock)
+
+
+def test_round_trip(signer, clock):
+    token = signer.issue("DMS", 42)
+    assert token.startswith("SES:DMS:42:")
+    assert is_session_token(token)
+    assert signer.verify(token) == ("DMS", 42, clock.now + 30, False)
+
+
+def test_expiry_honours_skew(signer, clock):
+    token = signer.issue("DMS", 42)
+    clock.now += 35
+    signer.verify(token)
+    clock.now += 1
+    with pytest.raises(ExpiredToken):
+        signer.verify(token)
+
+
+def test_tampered_fields_are_rejected(signer):
+    token = signer.issue("DMS", 42)
+    with pytest.raises(InvalidToken):
+        signer.verify(token.replace(":42:", ":43:"))
+    with pytest.raises(InvalidToken):
+        SessionTokenSigner("other-secret").verify(token)
+
+
+def test_printed_codes_cannot_be_relabelled(signer):
+    printed = signer.issue("DMS", 42, expires_at=2_000_000, printed=True)
+    assert printed.startswith("PRT:")
+    assert signer.verify(printed).printed
+    with pytest.raises(InvalidToken):
+        signer.verify("SES:" + printed[4:])
+
+
+@pytest.mark.parametrize("data", [
+    "SES:DMS:3:9999999999:éé",
+    "SES:DÉMS:3:9999999999:abc",
+    "SES:DMS:3:9999999999",
+    "SES:DMS:x:9999999999:abc",
+    "SES::3:9999999999:abc",
+])
+def test_malformed_payloads_raise_invalid_token(signer, data):
+    with pytest.raises(InvalidToken):
+        signer.verify(data)
+
+
+def test_missing_secret_disables_signer():
+    signer = SessionTokenSigner("")
+    assert not signer.configured
+    with pytest.raises(MissingSecret):
+        signer.issue("DMS", 1)
+    with pytest.raises(MissingSecret):
+        signer.verify(SessionTokenSigner("k").issue("DMS", 1))
@@ -0,0 +1 @@
+# makes the 'tools' directory a package
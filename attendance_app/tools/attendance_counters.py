@@ -0,0 +1,49 @@
+"""
+Check or rebuild the attendance counter tables.
+
+Run from the attendance_app directory:
+    python -m tools.attendance_counters            # report drift
+    python -m tools.attendance_counters --rebuild  # report, then rebuild if drifted
+"""
+import argparse
+import sys
+
+from utils.helpers import verify_attendance_counters, rebuild_attendance_counters
+
+
+def print_drift(drift):
+    for kind, student_id, class_id, expected, actual in drift:
+        who = f"student {student_id}, class {class_id}" if student_id is not None else f"class {class_id}"
+        print(f"  {kind:<15} {who}: expected {expected}, counter has {actual}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify or rebuild attendance counters.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="rebuild the counters when drift is found")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild even when no drift is found")
+    args = parser.parse_args(argv)
+
+    drift = verify_attendance_counters()
+    if drift:
+        print(f"Found {len(drift)} drifted counter(s):")
+        print_drift(drift)
+    else:
+        print("Counters match the attendance tables.")
+
+    if args.force or (args.rebuild and drift):
+        rebuild_attendance_counters()
+        remaining = verify_attendance_counters()
+        if remaining:
+            print(f"Rebuild finished but {len(remaining)} counter(s) still differ:")
+            print_drift(remaining)
+            return 1
+        print("Counters rebuilt.")
+        return 0
+
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
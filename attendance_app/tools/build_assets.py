@@ -0,0 +1,97 @@
+"""
+Prepare startup assets ahead of time (run again after changing images or fonts).
+
+Run from the attendance_app directory:
+    python -m tools.build_assets              # backgrounds + fonts
+    python -m tools.build_assets --scale 2    # for high-DPI screens
+    python -m tools.build_assets --skip-fonts
+
+Backgrounds (the BACKGROUNDS files next to app.py that the screens use) are
+downscaled to the window size and packed into one Kivy atlas. The regular and bold NotoSans fonts
+are subset to the characters the UI can show (needs `pip install fonttools`).
+Results go to assets/, which utils/assets.py picks up at startup.
+"""
+import argparse
+import os
+import string
+import sys
+import tempfile
+
+from utils.assets import ASSET_DIR, BACKGROUND_ATLAS, BACKGROUNDS, FONT_DIR, FONT_FILES
+from utils.helpers import WINDOW_SIZE
+
+SOURCE_FONT_DIR = "fonts"
+ATLAS_PAGE_SIZE = 2048
+# ASCII for the UI text plus Latin-1 for student names
+FONT_CHARACTERS = string.printable + "".join(chr(c) for c in range(0xA0, 0x100))
+
+
+def build_backgrounds(scale):
+    from PIL import Image as PILImage
+    from kivy.atlas import Atlas
+
+    sources = [path for path in BACKGROUNDS if os.path.exists(path)]
+    for path in sorted(set(BACKGROUNDS) - set(sources)):
+        print(f"  {path}: missing, the screen falls back to no background")
+    if not sources:
+        print("No background images found.")
+        return False
+    target = (int(WINDOW_SIZE[0] * scale), int(WINDOW_SIZE[1] * scale))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        resized = []
+        for path in sources:
+            with PILImage.open(path) as img:
+                # screens stretch the background to the window, so match its shape
+                small = img.convert("RGB").resize(target, PILImage.LANCZOS)
+                out = os.path.join(tmp, os.path.basename(path))
+                small.save(out, optimize=True)
+                resized.append(out)
+            print(f"  {path}: {os.path.getsize(path) // 1024} KB -> {os.path.getsize(out) // 1024} KB")
+        os.makedirs(ASSET_DIR, exist_ok=True)
+        Atlas.create(BACKGROUND_ATLAS, resized, ATLAS_PAGE_SIZE)
+    print(f"Wrote {BACKGROUND_ATLAS}.atlas ({len(resized)} images at {target[0]}x{target[1]})")
+    return True
+
+
+def build_fonts():
+    try:
+        from fontTools import subset
+    except ImportError:
+        print("fonttools is not installed; skipping font subsetting.")
+        return False
+
+    os.makedirs(FONT_DIR, exist_ok=True)
+    options = subset.Options()
+    options.layout_features = ["kern", "liga"]
+    for name in FONT_FILES.values():
+        source = os.path.join(SOURCE_FONT_DIR, name)
+        out = os.path.join(FONT_DIR, name)
+        font = subset.load_font(source, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=FONT_CHARACTERS)
+        subsetter.subset(font)
+        subset.save_font(font, out, options)
+        print(f"  {source}: {os.path.getsize(source) // 1024} KB -> {os.path.getsize(out) // 1024} KB")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Downscale backgrounds into an atlas and subset fonts.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of the window size to keep")
+    parser.add_argument("--skip-backgrounds", action="store_true")
+    parser.add_argument("--skip-fonts", action="store_true")
+    args = parser.parse_args(argv)
+
+    ok = True
+    if not args.skip_backgrounds:
+        print("Backgrounds:")
+        ok = build_backgrounds(args.scale) and ok
+    if not args.skip_fonts:
+        print("Fonts:")
+        ok = build_fonts() and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
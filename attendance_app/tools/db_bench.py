@@ -0,0 +1,360 @@
+"""
+Benchmark the attendance data layer (utils/helpers.py) on synthetic data at
+several scales and report latency percentiles and throughput per helper.
+
+Run from the attendance_app directory:
+    python -m tools.db_bench --dsn "host=localhost user=postgres"     # existing server
+    python -m tools.db_bench --initdb                                 # throwaway local cluster
+    python -m tools.db_bench --initdb --scales 1000x10x30,20000x60x60 --concurrency 8
+    python -m tools.db_bench --initdb --json after.json --compare before.json
+
+A scale is STUDENTSxCLASSESxSESSIONS (sessions per class, spread over a
+semester that ends today). Each scale gets a scratch database, migrated with
+the migrations in attendance_app/migrations, filled server-side and dropped
+afterwards (keep it with --keep). --initdb needs the PostgreSQL server
+binaries (initdb, pg_ctl) on PATH and must not run as root.
+
+--compare prints the change against an earlier --json file and exits 1
+when a p50/p99 latency or the throughput regressed by more than
+--max-regression percent.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psycopg2
+from psycopg2.extensions import make_dsn
+
+from tools.stats import percentile
+from utils import helpers
+from utils.db_pool import ConnectionPool
+from utils.migrations import migrate
+
+BENCH_DB = "attendance_bench"
+DEFAULT_SCALES = "1000x10x30,10000x40x60"
+SEMESTER_WEEKS = 16
+
+# Everything is generated inside PostgreSQL; setseed() makes it repeatable.
+SYNTHETIC_DATA_SQL = """
+INSERT INTO Teachers (name, email, password_hash)
+VALUES ('Bench Teacher', 'teacher@bench.invalid', 'x');
+
+INSERT INTO Classes (class_name, teacher_id)
+SELECT 'BENCH-' || lpad(c::text, 4, '0'), (SELECT MIN(teacher_id) FROM Teachers)
+FROM generate_series(1, %(classes)s) c;
+
+INSERT INTO Students (name, roll_no, email, password_hash)
+SELECT 'Student ' || s, 'B' || lpad(s::text, 6, '0'), 's' || s || '@bench.invalid', 'x'
+FROM generate_series(1, %(students)s) s;
+
+-- every student takes `per_student` distinct classes, spread evenly
+INSERT INTO Enrollments (student_id, class_id)
+SELECT st.student_id, cl.class_id
+FROM (SELECT student_id, row_number() OVER (ORDER BY student_id) - 1 AS n FROM Students) st
+CROSS JOIN generate_series(0, %(per_student)s - 1) t
+JOIN (SELECT class_id, row_number() OVER (ORDER BY class_id) - 1 AS n FROM Classes) cl
+  ON cl.n = (st.n + t * (%(classes)s / %(per_student)s)) %% %(classes)s;
+
+-- past sessions, one hour each, evenly spaced over the semester
+INSERT INTO Sessions (class_id, start_time, end_time, is_active)
+SELECT cl.class_id, ts, ts + INTERVAL '1 hour', FALSE
+FROM Classes cl
+CROSS JOIN generate_series(0, %(sessions)s - 1) i
+CROSS JOIN LATERAL (
+    SELECT date_trunc('day', LOCALTIMESTAMP - %(weeks)s * INTERVAL '1 week')
+           + (i * %(weeks)s * 7 / %(sessions)s) * INTERVAL '1 day'
+           + (8 + cl.class_id %% 9) * INTERVAL '1 hour' AS ts
+) start;
+
+-- one session per class open right now, for the mark benchmark
+INSERT INTO Sessions (class_id, start_time, end_time, is_active)
+SELECT class_id, LOCALTIMESTAMP - INTERVAL '10 minutes', LOCALTIMESTAMP + INTERVAL '2 hours', TRUE
+FROM Classes;
+
+-- bulk load without the per-row counter trigger, then rebuild the counters once
+ALTER TABLE Attendance DISABLE TRIGGER attendance_counts;
+INSERT INTO Attendance (session_id, student_id, session_start, marked_at)
+SELECT ses.session_id, e.student_id, ses.start_time, ses.start_time + INTERVAL '5 minutes'
+FROM Sessions ses
+JOIN Enrollments e ON e.class_id = ses.class_id
+WHERE ses.end_time < LOCALTIMESTAMP AND random() < %(attendance_rate)s;
+ALTER TABLE Attendance ENABLE TRIGGER attendance_counts;
+SELECT rebuild_attendance_counters();
+"""
+
+TABLES = ("Students", "Classes", "Enrollments", "Sessions", "Attendance", "Attendance_counts")
+
+
+class TempCluster:
+    """A throwaway PostgreSQL cluster in a temp directory, reachable only over its unix socket."""
+    def __init__(self, port=5432):
+        self.port = port
+        self.root = None
+
+    def start(self):
+        initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+        if not (initdb and pg_ctl):
+            raise RuntimeError("initdb / pg_ctl not found on PATH")
+        self.root = tempfile.mkdtemp(prefix="attendance-bench-")
+        data = os.path.join(self.root, "data")
+        subprocess.run([initdb, "-D", data, "-U", "postgres", "-A", "trust", "--no-sync"],
+                       check=True, capture_output=True)
+        options = f"-p {self.port} -k {self.root} -c listen_addresses=''"
+        subprocess.run([pg_ctl, "-D", data, "-o", options, "-l", os.path.join(self.root, "server.log"),
+                        "-w", "start"], check=True, capture_output=True)
+        return make_dsn(host=self.root, port=self.port, user="postgres", dbname="postgres")
+
+    def stop(self):
+        if self.root is None:
+            return
+        subprocess.run([shutil.which("pg_ctl"), "-D", os.path.join(self.root, "data"),
+                        "-m", "fast", "-w", "stop"], capture_output=True)
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root = None
+
+
+def parse_scale(text):
+    students, classes, sessions = (int(part) for part in text.lower().split("x"))
+    return {"students": students, "classes": classes, "sessions": sessions}
+
+
+def _admin(dsn, statement):
+    conn = psycopg2.connect(dsn)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(statement)
+    finally:
+        conn.close()
+
+
+def provision(admin_dsn, scale, per_student, attendance_rate, seed):
+    """Create, migrate and fill the scratch database. Returns (dsn, row counts)."""
+    _admin(admin_dsn, f"DROP DATABASE IF EXISTS {BENCH_DB}")
+    _admin(admin_dsn, f"CREATE DATABASE {BENCH_DB}")
+    dsn = make_dsn(admin_dsn, dbname=BENCH_DB)
+    conn = psycopg2.connect(dsn)
+    try:
+        migrate(conn)
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT ensure_attendance_partitions((CURRENT_DATE - %s * INTERVAL '1 week')::DATE, "
+                "(CURRENT_DATE + INTERVAL '1 month')::DATE)", (SEMESTER_WEEKS + 1,))
+            cur.execute("SELECT setseed(%s)", (seed,))
+            cur.execute(SYNTHETIC_DATA_SQL, dict(
+                scale, per_student=min(per_student, scale["classes"]),
+                attendance_rate=attendance_rate, weeks=SEMESTER_WEEKS))
+            conn.commit()
+            cur.execute("ANALYZE")
+            counts = {}
+            for table in TABLES:
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table.lower()] = cur.fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    return dsn, counts
+
+
+def load_workload(dsn, mark_ops, read_ops, rng):
+    """Pick (student_id, class_name) pairs to mark and student_ids to read."""
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT e.student_id, c.class_name
+                FROM Enrollments e JOIN Classes c ON c.class_id = e.class_id
+            """)
+            enrollments = cur.fetchall()
+            cur.execute("SELECT student_id FROM Students")
+            students = [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+    # distinct pairs, so every call is a fresh mark and not a duplicate
+    marks = rng.sample(enrollments, min(mark_ops, len(enrollments)))
+    reads = [rng.choice(students) for _ in range(read_ops)]
+    return marks, reads
+
+
+def run_helper(fn, calls, concurrency, ok):
+    """Call fn(*args) for every args tuple in `calls` on `concurrency` threads."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    pending = iter(calls)
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                args = next(pending, None)
+            if args is None:
+                return
+            t0 = time.perf_counter()
+            result = fn(*args)
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                errors += not ok(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "errors": errors,
+        "throughput_ops_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def bench_scale(dsn, marks, reads, full_scans, concurrency):
+    # point the helpers at the scratch database
+    helpers.db_pool = ConnectionPool({"dsn": dsn}, min_size=1, max_size=concurrency + 1)
+    helpers.session_cache.invalidate()
+    helpers.db_pool.warm()
+    try:
+        return {
+            "update_attendance": run_helper(
+                helpers.update_attendance, marks, concurrency,
+                ok=lambda status: status == helpers.MARK_MARKED),
+            "get_student_attendance": run_helper(
+                helpers.get_student_attendance, [(s,) for s in reads], concurrency,
+                ok=bool),
+            "get_all_attendance": run_helper(
+                helpers.get_all_attendance, [()] * full_scans, 1,
+                ok=bool),
+        }
+    finally:
+        helpers.db_pool.close()
+
+
+def print_row(label, result):
+    print(f"{label:<26} {result['ops']:>6} {result['throughput_ops_s']:>10.1f} "
+          f"{result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+          f"{result['max_ms']:>9.2f} {result['errors']:>6}")
+
+
+def compare(baseline, report, max_regression):
+    """Print the change per (scale, helper); returns the list of regressions."""
+    previous = {(r["scale"], name): stats
+                for r in baseline.get("scales", []) for name, stats in r["results"].items()}
+    regressions = []
+    print(f"\nChange against {baseline.get('commit') or 'baseline'}:")
+    for entry in report["scales"]:
+        for name, stats in entry["results"].items():
+            old = previous.get((entry["scale"], name))
+            if old is None:
+                continue
+            changes = []
+            for key, higher_is_worse in (("p50_ms", True), ("p99_ms", True), ("throughput_ops_s", False)):
+                if not old[key]:
+                    continue
+                pct = (stats[key] - old[key]) / old[key] * 100
+                changes.append(f"{key} {pct:+.1f}%")
+                if (pct if higher_is_worse else -pct) > max_regression:
+                    regressions.append(f"{entry['scale']} {name} {key} {pct:+.1f}%")
+            print(f"  {entry['scale']:<18} {name:<24} {'  '.join(changes)}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the attendance helpers on synthetic data.")
+    server = parser.add_mutually_exclusive_group(required=True)
+    server.add_argument("--dsn", help="libpq DSN of a server where a scratch database may be created")
+    server.add_argument("--initdb", action="store_true", help="start a throwaway local cluster")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="STUDENTSxCLASSESxSESSIONS, comma separated")
+    parser.add_argument("--classes-per-student", type=int, default=5)
+    parser.add_argument("--attendance-rate", type=float, default=0.8)
+    parser.add_argument("--marks", type=int, default=2000, help="update_attendance calls per scale")
+    parser.add_argument("--reads", type=int, default=2000, help="get_student_attendance calls per scale")
+    parser.add_argument("--full-scans", type=int, default=5, help="get_all_attendance calls per scale")
+    parser.add_argument("--concurrency", type=int, default=1, help="threads calling each helper")
+    parser.add_argument("--seed", type=float, default=0.42, help="between -1 and 1 (PostgreSQL setseed)")
+    parser.add_argument("--keep", action="store_true", help=f"leave the {BENCH_DB} database behind")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--compare", help="earlier --json results to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="percent, for --compare")
+    args = parser.parse_args(argv)
+
+    cluster = TempCluster() if args.initdb else None
+    try:
+        admin_dsn = cluster.start() if cluster else args.dsn
+    except (RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"Error starting PostgreSQL: {e}")
+        return 1
+
+    report = {"commit": git_commit(),
+              "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+              "concurrency": args.concurrency, "scales": []}
+    try:
+        conn = psycopg2.connect(admin_dsn)
+        report["server_version"] = conn.server_version
+        conn.close()
+
+        print(f"{'helper':<26} {'ops':>6} {'ops/s':>10} {'p50 ms':>8} {'p90 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>9} {'errors':>6}")
+        for text in args.scales.split(","):
+            scale = parse_scale(text)
+            started = time.perf_counter()
+            dsn, counts = provision(admin_dsn, scale, args.classes_per_student,
+                                    args.attendance_rate, args.seed)
+            setup_seconds = time.perf_counter() - started
+            marks, reads = load_workload(dsn, args.marks, args.reads, random.Random(args.seed))
+            print(f"-- {text}: {counts['attendance']} attendance rows, set up in {setup_seconds:.1f}s")
+
+            results = bench_scale(dsn, marks, reads, args.full_scans, args.concurrency)
+            for name, result in results.items():
+                print_row(name, result)
+            report["scales"].append({"scale": text, **scale, "rows": counts,
+                                     "setup_seconds": round(setup_seconds, 2), "results": results})
+            if not args.keep:
+                _admin(admin_dsn, f"DROP DATABASE IF EXISTS {BENCH_DB}")
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        return 1
+    finally:
+        if cluster:
+            cluster.stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.max_regression)
+        if regressions:
+            print("Regressions over {:.0f}%: {}".format(args.max_regression, "; ".join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
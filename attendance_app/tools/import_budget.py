@@ -0,0 +1,89 @@
+"""
+Startup import-time budget, measured with `python -X importtime`.
+
+Run from the attendance_app directory:
+    python -m tools.import_budget                    # report, fail if over budget
+    python -m tools.import_budget --top 30 --budget-ms 600
+    python -m tools.import_budget --json importtime.json
+
+Imports `app` in a fresh interpreter (no window is opened), then reports
+the total import time, the slowest modules, and any heavy module that
+should only load when its feature is used (cv2, pandas, pyzbar, qrcode).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 800
+DEFERRED_MODULES = ("cv2", "pandas", "pyzbar", "qrcode")
+
+
+def measure(module="app", runs=1):
+    """
+    Import `module` in `runs` fresh interpreters; returns the run with the
+    lowest total as {top-level import name: (self_us, cumulative_us)}.
+    """
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1", KIVY_NO_FILELOG="1")
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              capture_output=True, text=True, env=env)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+        timings = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            timings[name.strip()] = (int(self_us), int(cumulative_us))
+        total = sum(self_us for self_us, _ in timings.values())
+        if best is None or total < best[0]:
+            best = (total, timings)
+    return best[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check app import time against a budget.")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters; the fastest run counts")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        timings = measure(args.module, args.runs)
+    except RuntimeError as e:
+        print(f"Error importing {args.module}: {e}")
+        return 1
+
+    total_ms = sum(self_us for self_us, _ in timings.values()) / 1000
+    roots = {name.split(".")[0] for name in timings}
+    leaked = [name for name in DEFERRED_MODULES if name in roots]
+
+    print(f"{'module':<45} {'self ms':>9} {'cumul ms':>9}")
+    slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{name:<45} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}")
+    print(f"\nTotal import time: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if leaked:
+        print(f"Imported at startup but should be deferred: {', '.join(leaked)}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "module": args.module,
+                "total_ms": round(total_ms, 1),
+                "budget_ms": args.budget_ms,
+                "deferred_leaks": leaked,
+                "slowest": [{"module": name, "self_ms": s / 1000, "cumulative_ms": c / 1000}
+                            for name, (s, c) in slowest],
+            }, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 1 if leaked or total_ms > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
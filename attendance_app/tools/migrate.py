@@ -0,0 +1,59 @@
+"""
+Apply the versioned schema migrations in attendance_app/migrations.
+
+Run from the attendance_app directory:
+    python -m tools.migrate              # apply everything pending
+    python -m tools.migrate --status     # list applied / pending migrations
+    python -m tools.migrate --target 3   # apply up to 0003 only
+"""
+import argparse
+import sys
+
+from utils.helpers import get_db_connection
+from utils.migrations import (
+    MigrationError,
+    PARTITION_MONTHS_AHEAD,
+    ensure_partitions,
+    hash_legacy_passwords,
+    migrate,
+    migration_status,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument("--status", action="store_true", help="show migration status and exit")
+    parser.add_argument("--target", type=int, help="highest migration version to apply")
+    parser.add_argument("--partitions-ahead", type=int, default=PARTITION_MONTHS_AHEAD,
+                        help="months of Attendance partitions to create ahead of today")
+    args = parser.parse_args(argv)
+
+    with get_db_connection() as conn:
+        if args.status:
+            for migration, state in migration_status(conn):
+                print(f"  {migration.version:04d}_{migration.name:<30} {state}")
+            return 0
+
+        try:
+            applied = migrate(conn, target=args.target)
+        except MigrationError as e:
+            print(f"Error: {e}")
+            return 1
+
+        for migration in applied:
+            print(f"Applied {migration.version:04d}_{migration.name}")
+        if not applied:
+            print("Schema is up to date.")
+
+        # no-op until the partitioned Attendance migration has been applied
+        ensure_partitions(conn, args.partitions_ahead)
+
+        # login only accepts hashed passwords
+        hashed = hash_legacy_passwords(conn)
+        if hashed:
+            print(f"Hashed {hashed} plain-text student passwords")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
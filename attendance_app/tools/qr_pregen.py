@@ -0,0 +1,135 @@
+"""
+Pre-generate QR code PNGs in bulk, in parallel.
+
+Run from the attendance_app directory:
+    python -m tools.qr_pregen                      # bare code per entry in SUBJECTS
+    python -m tools.qr_pregen --source sessions    # printed code per upcoming session
+    python -m tools.qr_pregen --source students    # kiosk check-in code per student
+    python -m tools.qr_pregen --force --workers 8
+
+Session codes carry the PRT: prefix and stay valid until the session ends,
+so the app only accepts them with ALLOW_PRINTED_SESSION_QR; bare subject
+codes need ALLOW_PLAIN_CLASS_QR. Neither is on by default, and the tool
+refuses to generate codes the app would reject.
+
+Files are written atomically. A manifest in the output directory records a
+hash of each file's payload and render settings, so codes that have not
+changed are skipped on the next run.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.helpers import (
+    ALLOW_PLAIN_CLASS_QR,
+    ALLOW_PRINTED_SESSION_QR,
+    QR_RENDER_CONFIG,
+    QR_SAVE_DIR,
+    STUDENT_QR_PREFIX,
+    STUDENT_QR_SIZE,
+    SUBJECTS,
+    get_scheduled_sessions,
+    roster,
+    session_tokens,
+)
+from utils.qr_render import payload_digest, render_qr_file, write_atomic
+
+MANIFEST_NAME = ".manifest.json"
+
+
+def subject_jobs():
+    """Bare class-id codes (only accepted when ALLOW_PLAIN_CLASS_QR is set)."""
+    return [(f"{subject}.png", subject, QR_RENDER_CONFIG) for subject in SUBJECTS]
+
+
+def session_jobs():
+    """One signed PRT: code per session that has not ended, valid until the session ends."""
+    jobs = []
+    for session_id, class_name, start_time, end_time in get_scheduled_sessions():
+        token = session_tokens.issue(class_name, session_id, expires_at=end_time.timestamp(),
+                                     printed=True)
+        name = f"sessions/{class_name}_{start_time:%Y%m%d_%H%M}_{session_id}.png"
+        jobs.append((name, token, QR_RENDER_CONFIG))
+    return jobs
+
+
+def student_jobs():
+    roster.ensure_loaded()
+    params = dict(QR_RENDER_CONFIG, size=STUDENT_QR_SIZE)
+    return [(f"students/{roll_no}.png", f"{STUDENT_QR_PREFIX}{roll_no}", params)
+            for roll_no in sorted(roster.by_roll)]
+
+
+JOB_SOURCES = {"subjects": subject_jobs, "sessions": session_jobs, "students": student_jobs}
+
+# sources whose codes the app rejects unless the named setting is enabled
+DISABLED_SOURCES = {
+    "subjects": ("ALLOW_PLAIN_CLASS_QR", ALLOW_PLAIN_CLASS_QR),
+    "sessions": ("ALLOW_PRINTED_SESSION_QR", ALLOW_PRINTED_SESSION_QR),
+}
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate QR code images in bulk.")
+    parser.add_argument("--source", choices=sorted(JOB_SOURCES), default="subjects")
+    parser.add_argument("--out", default=QR_SAVE_DIR, help="output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="render processes")
+    parser.add_argument("--force", action="store_true", help="re-render even unchanged codes")
+    args = parser.parse_args(argv)
+
+    setting, enabled = DISABLED_SOURCES.get(args.source, (None, True))
+    if not enabled:
+        print(f"Error: {setting} is off, so the app would reject {args.source} codes.")
+        return 2
+
+    started = time.perf_counter()
+    try:
+        jobs = JOB_SOURCES[args.source]()
+    except Exception as e:
+        print(f"Error listing {args.source}: {e}")
+        return 1
+
+    manifest = load_manifest(args.out)
+    todo = []
+    for name, payload, params in jobs:
+        digest = payload_digest(payload, **params)
+        path = os.path.join(args.out, name)
+        if not args.force and manifest.get(name) == digest and os.path.exists(path):
+            continue
+        todo.append((name, path, payload, params, digest))
+
+    failed = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(render_qr_file, path, payload, params): (name, digest)
+                       for name, path, payload, params, digest in todo}
+            for future in as_completed(futures):
+                name, digest = futures[future]
+                try:
+                    future.result()
+                    manifest[name] = digest
+                except Exception as e:
+                    failed += 1
+                    print(f"Error rendering {name}: {e}")
+        write_atomic(os.path.join(args.out, MANIFEST_NAME),
+                     json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(todo) - failed} written, {len(jobs) - len(todo)} unchanged, "
+          f"{failed} failed in {elapsed:.2f}s -> {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
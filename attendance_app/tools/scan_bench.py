@@ -0,0 +1,127 @@
+"""
+Replay frames through the QR scanner without a camera or a window and
+report decode throughput, latency percentiles and detection rate.
+
+Run from the attendance_app directory:
+    python -m tools.scan_bench                          # synthetic grid (resolution x blur x lighting)
+    python -m tools.scan_bench --video clip.mp4 --expect DBMS
+    python -m tools.scan_bench --images frames/          # files named '<payload>__*.png'
+    python -m tools.scan_bench --binarize --max-width 480 --json results.json
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+
+from tools.stats import percentile
+from utils.frame_sources import ImageDirSource, SyntheticSource, VideoFileSource
+from utils.helpers import SCAN_CONFIG, STUDENT_QR_PREFIX, SUBJECTS
+from utils.scanner import QrScanner
+
+
+def run_source(source, scanner, max_frames=None):
+    """Scan every frame of `source` back to back; returns a result dict."""
+    latencies = []
+    hits = 0
+    started = time.perf_counter()
+    while max_frames is None or len(latencies) < max_frames:
+        ret, frame = source.read()
+        if not ret:
+            break
+        t0 = time.perf_counter()
+        detections = scanner.scan(frame)
+        latencies.append(time.perf_counter() - t0)
+        if source.expected is None:
+            hits += bool(detections)
+        else:
+            hits += any(d.data == source.expected for d in detections)
+    elapsed = time.perf_counter() - started
+    source.release()
+
+    latencies.sort()
+    frames = len(latencies)
+    return {
+        "frames": frames,
+        "fps": frames / sum(latencies) if latencies else 0.0,
+        "loop_fps": frames / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "detection_rate": hits / frames if frames else 0.0,
+    }
+
+
+def parse_resolution(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def print_row(label, result):
+    print(f"{label:<34} {result['frames']:>6} {result['fps']:>8.1f} "
+          f"{result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+          f"{result['detection_rate'] * 100:>6.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the QR scanner on recorded or synthetic frames.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--video", help="recorded video file to replay")
+    source.add_argument("--images", help="directory of still images to replay")
+    parser.add_argument("--expect", help="payload every frame of --video should decode to")
+    parser.add_argument("--frames", type=int, default=100, help="frames per synthetic case (or cap for recordings)")
+    parser.add_argument("--resolutions", default="640x480,1280x720,1920x1080")
+    parser.add_argument("--blur", default="0,2,4", help="Gaussian blur radii, comma separated")
+    parser.add_argument("--brightness", default="1.0,0.5,1.4", help="lighting gains, comma separated")
+    parser.add_argument("--qr-fraction", type=float, default=0.3, help="code size relative to the short side")
+    parser.add_argument("--drift", type=int, default=4, help="max pixels the synthetic code moves per frame")
+    parser.add_argument("--max-width", type=int, default=SCAN_CONFIG["max_width"])
+    parser.add_argument("--binarize", action="store_true", default=SCAN_CONFIG["binarize"])
+    parser.add_argument("--no-roi", action="store_true", help="decode the full frame every time")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    config = dict(SCAN_CONFIG, max_width=args.max_width, binarize=args.binarize,
+                  track_roi=SCAN_CONFIG["track_roi"] and not args.no_roi)
+
+    print(f"{'case':<34} {'frames':>6} {'fps':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'hit':>7}")
+    results = []
+    try:
+        if args.video or args.images:
+            if args.video:
+                replay = VideoFileSource(args.video, expected=args.expect)
+            else:
+                replay = ImageDirSource(args.images)
+            label = args.video or args.images
+            result = dict(case=label, **run_source(replay, QrScanner(**config), max_frames=args.frames))
+            print_row(label, result)
+            results.append(result)
+        else:
+            payloads = list(SUBJECTS) + [f"{STUDENT_QR_PREFIX}21CS{n:03d}" for n in range(1, 6)]
+            cases = itertools.product(
+                [parse_resolution(r) for r in args.resolutions.split(",")],
+                [int(b) for b in args.blur.split(",")],
+                [float(g) for g in args.brightness.split(",")],
+            )
+            for resolution, blur, brightness in cases:
+                synthetic = SyntheticSource(payloads, frames=args.frames, resolution=resolution,
+                                            qr_fraction=args.qr_fraction, blur=blur, brightness=brightness,
+                                            drift=args.drift)
+                label = f"{resolution[0]}x{resolution[1]} blur={blur} light={brightness}"
+                result = dict(case=label, resolution=list(resolution), blur=blur, brightness=brightness,
+                              **run_source(synthetic, QrScanner(**config)))
+                print_row(label, result)
+                results.append(result)
+    except IOError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
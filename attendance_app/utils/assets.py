@@ -0,0 +1,71 @@
+import os
+
+# Output of tools/build_assets.py; everything here is optional at runtime
+ASSET_DIR = "assets"
+BACKGROUND_ATLAS = os.path.join(ASSET_DIR, "backgrounds")   # backgrounds.atlas + page PNGs
+FONT_DIR = os.path.join(ASSET_DIR, "fonts")
+FONT_NAME = "NotoSans"      # registered alongside Kivy's default font, not over it
+FONT_FILES = {
+    "fn_regular": "NotoSans-Regular.ttf",
+    "fn_bold": "NotoSans-Bold.ttf",
+}
+# every file passed to background_texture() by the screens; only these are packed
+BACKGROUNDS = ("bg2.png", "b3.png", "b4.png", "b5.png")
+
+_textures = {}      # source filename -> texture (or None if it could not be loaded)
+_atlas = None
+_font_registered = False
+
+
+def _background_atlas():
+    """The prebuilt background atlas, loaded once; None when it has not been built."""
+    global _atlas
+    if _atlas is None:
+        _atlas = False
+        path = BACKGROUND_ATLAS + ".atlas"
+        if os.path.exists(path):
+            from kivy.atlas import Atlas
+            try:
+                _atlas = Atlas(path)
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+    return _atlas or None
+
+
+def background_texture(filename):
+    """
+    Texture for a screen background, loaded once per run and shared by every
+    screen. Uses the downscaled copy from the atlas when one was built, and
+    falls back to the original file otherwise (None if that is missing too).
+    """
+    if filename in _textures:
+        return _textures[filename]
+    texture = None
+    atlas = _background_atlas()
+    if atlas is not None:
+        texture = atlas.textures.get(os.path.splitext(os.path.basename(filename))[0])
+    if texture is None and os.path.exists(filename):
+        from kivy.core.image import Image as CoreImage
+        texture = CoreImage(filename).texture
+    _textures[filename] = texture
+    return texture
+
+
+def register_fonts():
+    """Register the subsetted fonts as FONT_NAME, if they were built."""
+    global _font_registered
+    paths = {key: os.path.join(FONT_DIR, name) for key, name in FONT_FILES.items()}
+    if not os.path.exists(paths["fn_regular"]):
+        return False
+    from kivy.core.text import LabelBase
+    LabelBase.register(FONT_NAME, **{k: p for k, p in paths.items() if os.path.exists(p)})
+    _font_registered = True
+    return True
+
+
+def font_name():
+    """FONT_NAME once register_fonts() found it, else Kivy's default font."""
+    if _font_registered:
+        return FONT_NAME
+    from kivy.core.text import DEFAULT_FONT
+    return DEFAULT_FONT
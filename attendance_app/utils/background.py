@@ -0,0 +1,144 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from kivy.clock import Clock
+
+
+class Task:
+    """
+    Handle for a background call; cancel() drops its result even if it already ran.
+    Only futures the runner created itself (`owned`) are cancelled at the source;
+    a watched future belongs to its producer and is left alone.
+    """
+    def __init__(self, future, tag=None, owned=True):
+        self.future = future
+        self.tag = tag
+        self.owned = owned
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.owned:
+            self.future.cancel()
+
+    def done(self):
+        return self.cancelled or self.future.done()
+
+
+class BackgroundRunner:
+    """
+    Runs blocking work (database queries, subprocesses) on a small thread pool
+    and hands results back on the Kivy main thread.
+
+    on_success(result) / on_error(exception) are scheduled with Clock, so they
+    may touch widgets. Cancelled tasks never call back.
+    """
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bg")
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args, on_success=None, on_error=None, tag=None, **kwargs):
+        """Call fn(*args, **kwargs) on a worker thread. Returns a Task."""
+        return self._watch(Task(self.executor.submit(fn, *args, **kwargs), tag),
+                           on_success, on_error)
+
+    def watch(self, future, on_success=None, on_error=None, tag=None):
+        """Deliver an existing Future's outcome to the main thread. Returns a Task."""
+        return self._watch(Task(future, tag, owned=False), on_success, on_error)
+
+    def _watch(self, task, on_success, on_error):
+        future = task.future
+        with self._lock:
+            self._tasks.add(task)
+        future.add_done_callback(
+            lambda f: Clock.schedule_once(lambda dt: self._deliver(task, on_success, on_error))
+        )
+        return task
+
+    def _deliver(self, task, on_success, on_error):
+        self._forget(task)
+        if task.cancelled or task.future.cancelled():
+            return
+        error = task.future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                print(f"Background task failed: {error}")
+        elif on_success:
+            on_success(task.future.result())
+
+    def stream(self, fn, *args, on_batch=None, on_done=None, on_error=None, tag=None,
+               max_pending=4, **kwargs):
+        """
+        Iterate fn(*args, **kwargs) on a worker thread and pass each item to
+        on_batch(item) on the main thread, one item per frame; on_done() runs
+        after the last one. At most `max_pending` items wait in between, so
+        the producer never runs far ahead of the UI. Returns a Task.
+        """
+        items = queue.Queue(maxsize=max_pending)
+        task = Task(None, tag)
+
+        def produce():
+            iterator = iter(fn(*args, **kwargs))
+            try:
+                for item in iterator:
+                    while not task.cancelled:
+                        try:
+                            items.put(item, timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    if task.cancelled:
+                        return
+            finally:
+                close = getattr(iterator, "close", None)
+                if close:
+                    close()
+
+        def consume(dt):
+            if task.cancelled or task.future.cancelled():
+                self._forget(task)
+                return False
+            try:
+                item = items.get_nowait()
+            except queue.Empty:
+                if not task.future.done():
+                    return True
+                # the producer only finishes after its last put, so nothing is left
+                self._forget(task)
+                error = task.future.exception()
+                if error is not None:
+                    if on_error:
+                        on_error(error)
+                    else:
+                        print(f"Background stream failed: {error}")
+                elif on_done:
+                    on_done()
+                return False
+            if on_batch:
+                on_batch(item)
+            return True
+
+        task.future = self.executor.submit(produce)
+        with self._lock:
+            self._tasks.add(task)
+        Clock.schedule_interval(consume, 0)
+        return task
+
+    def _forget(self, task):
+        with self._lock:
+            self._tasks.discard(task)
+
+    def cancel_all(self, tag=None):
+        """Cancel every pending task, or only those with the given tag."""
+        with self._lock:
+            tasks = [t for t in self._tasks if tag is None or t.tag == tag]
+        for task in tasks:
+            task.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
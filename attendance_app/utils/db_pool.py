@@ -0,0 +1,214 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+
+
+class PoolExhausted(Exception):
+    """Raised when no connection becomes free within the borrow timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+
+    Connections are opened lazily (or up front by warm()), handed out by
+    connection(), health-checked before reuse and closed once they have sat
+    idle for longer than max_idle seconds while the pool is above min_size.
+    """
+    def __init__(self, db_config, min_size=2, max_size=10, max_idle=300,
+                 health_check_after=30, borrow_timeout=5, on_connect=None):
+        self.db_config = dict(db_config)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.borrow_timeout = borrow_timeout
+        self.on_connect = on_connect
+
+        self._cond = threading.Condition()
+        self._idle = []          # list of (conn, returned_at), most recent last
+        self._size = 0           # open connections, idle + borrowed
+        self._closed = False
+
+    # ---------------- connection lifecycle ----------------
+    def _open(self):
+        conn = psycopg2.connect(**self.db_config)
+        if self.on_connect:
+            self.on_connect(conn)
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if idle_for < self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    # ---------------- borrow / return ----------------
+    def getconn(self):
+        deadline = time.monotonic() + self.borrow_timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolExhausted("Connection pool is closed")
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                    conn, returned_at = None, None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhausted(
+                            f"No free connection after {self.borrow_timeout}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            # network work happens outside the lock
+            if conn is None:
+                try:
+                    return self._open()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._is_healthy(conn, time.monotonic() - returned_at):
+                return conn
+            self._discard(conn)
+            self._release_slot()
+
+    def putconn(self, conn, broken=False):
+        if broken or conn.closed:
+            self._discard(conn)
+            self._release_slot()
+            return
+        try:
+            # never hand out a connection with an open transaction
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            self._release_slot()
+            return
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with-block.
+        Commits on success and rolls back on error, like psycopg2's own
+        connection context manager, then returns the connection to the pool.
+        """
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except psycopg2.InterfaceError:
+            broken = True
+            raise
+        except psycopg2.OperationalError:
+            broken = True
+            raise
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.putconn(conn, broken=broken)
+
+    # ---------------- maintenance ----------------
+    def warm(self):
+        """Open connections until min_size are idle (blocking)."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._open()
+            except Exception as e:
+                self._release_slot()
+                print(f"Error warming connection pool: {e}")
+                return
+            self.putconn(conn)
+
+    def warm_async(self):
+        """Warm the pool on a daemon thread so startup is not blocked."""
+        t = threading.Thread(target=self.warm, name="db-pool-warm", daemon=True)
+        t.start()
+        return t
+
+    def recycle_idle(self):
+        """Close connections idle longer than max_idle, keeping min_size open."""
+        now = time.monotonic()
+        stale = []
+        with self._cond:
+            keep = []
+            # oldest first, so the most recently used connections survive
+            for conn, returned_at in self._idle:
+                if (now - returned_at > self.max_idle
+                        and self._size - len(stale) > self.min_size):
+                    stale.append(conn)
+                else:
+                    keep.append((conn, returned_at))
+            self._idle = keep
+            self._size -= len(stale)
+        for conn in stale:
+            self._discard(conn)
+        return len(stale)
+
+    def start_reaper(self, interval=60):
+        """Run recycle_idle() every `interval` seconds on a daemon thread."""
+        def loop():
+            while not self._closed:
+                time.sleep(interval)
+                self.recycle_idle()
+        t = threading.Thread(target=loop, name="db-pool-reaper", daemon=True)
+        t.start()
+        return t
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
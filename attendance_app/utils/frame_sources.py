@@ -0,0 +1,161 @@
+import os
+import random
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class CameraSource:
+    """Live camera; the default source of the scanner."""
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        self.expected = None
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Frames of a recorded video file, optionally looped."""
+    def __init__(self, path, loop=False, expected=None):
+        self.path = path
+        self.loop = loop
+        self.expected = expected
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video {path}")
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirSource:
+    """
+    Every image in a directory, in name order. A file named
+    '<payload>__anything.png' records the payload it should decode to.
+    """
+    def __init__(self, directory, loop=False):
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.paths:
+            raise IOError(f"No images in {directory}")
+        self.loop = loop
+        self.index = 0
+        self.expected = None
+
+    def read(self):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        path = self.paths[self.index]
+        self.index += 1
+        name = os.path.basename(path)
+        self.expected = name.split("__", 1)[0] if "__" in name else None
+        frame = cv2.imread(path)
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+
+def render_qr(payload, module_px=8, border=4):
+    """Render `payload` as a grayscale QR image (numpy uint8)."""
+    import qrcode
+    qr = qrcode.QRCode(version=None, box_size=module_px, border=border)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    return np.array(qr.make_image(fill_color="black", back_color="white").convert("L"))
+
+
+class SyntheticSource:
+    """
+    Frames with a rendered QR code placed on a noisy background, with
+    controllable resolution, blur and lighting. `expected` holds the payload
+    of the frame last returned.
+
+    The code starts at a random spot and moves at most `drift` pixels per
+    frame, like a phone held in front of a camera, so ROI tracking in the
+    scanner sees realistic motion instead of a jump every frame.
+    """
+    def __init__(self, payloads, frames=100, resolution=(1280, 720), qr_fraction=0.3,
+                 blur=0, brightness=1.0, noise=8, seed=0, drift=4):
+        self.payloads = list(payloads)
+        self.frames = frames
+        self.width, self.height = resolution
+        self.qr_fraction = qr_fraction
+        self.blur = blur
+        self.brightness = brightness
+        self.noise = noise
+        self.drift = drift
+        self.position = None
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.count = 0
+        self.expected = None
+        self._codes = {}
+
+    def _code(self, payload):
+        if payload not in self._codes:
+            self._codes[payload] = render_qr(payload)
+        return self._codes[payload]
+
+    def read(self):
+        if self.count >= self.frames:
+            return False, None
+        payload = self.payloads[self.count % len(self.payloads)]
+        self.count += 1
+        self.expected = payload
+
+        frame = np.full((self.height, self.width), 170, dtype=np.uint8)
+        if self.noise:
+            jitter = self.np_rng.integers(-self.noise, self.noise + 1, frame.shape)
+            frame = np.clip(frame.astype(np.int16) + jitter, 0, 255).astype(np.uint8)
+
+        side = max(int(min(self.width, self.height) * self.qr_fraction), 21)
+        code = cv2.resize(self._code(payload), (side, side), interpolation=cv2.INTER_NEAREST)
+        if self.position is None:
+            x = self.rng.randint(0, self.width - side)
+            y = self.rng.randint(0, self.height - side)
+        else:
+            x, y = self.position
+            x = min(max(x + self.rng.randint(-self.drift, self.drift), 0), self.width - side)
+            y = min(max(y + self.rng.randint(-self.drift, self.drift), 0), self.height - side)
+        self.position = (x, y)
+        frame[y:y + side, x:x + side] = code
+
+        if self.blur:
+            k = self.blur * 2 + 1
+            frame = cv2.GaussianBlur(frame, (k, k), 0)
+        if self.brightness != 1.0:
+            frame = cv2.convertScaleAbs(frame, alpha=self.brightness, beta=0)
+        return True, cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+    def release(self):
+        pass
+
+
+def open_frame_source(spec, loop=False):
+    """
+    Frame source from a short description: a camera index (int or digit
+    string), a directory of images, or a video file path.
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, loop=loop)
+    return VideoFileSource(spec, loop=loop)
@@ -1,6 +1,12 @@
-import subprocess
-import psycopg2
-from datetime import datetime
+import os
+import threading
+from concurrent.futures import Future
+
+from utils.db_pool import ConnectionPool
+from utils.session_cache import ActiveSessionCache
+from utils.roster import Roster
+from utils.network import NetworkPresence
+from utils.session_tokens import SessionTokenSigner
 
 # ---------- Data / constants (unchanged) ----------
 TEACHER_CREDENTIALS = {
@@ -17,14 +23,11 @@ TEACHER_CREDENTIALS = {
 EXPECTED_WIFI = "Mayank"
 CSV_FILE = "attendance.csv"
 
-students = {
-    "11": ("Arin", "arin"),
-    "28": ("Mayank", "mayank"),
-    "19": ("Gatik", "gatik"),
-}
-
 SUBJECTS = ["DMS", "COA", "TOC", "DBMS", "OOPSJ", "LMP-2", "LOOPSJ", "LCOA", "LDBMS"]
 
+# Kiosk window size; tools/build_assets.py scales backgrounds to it
+WINDOW_SIZE = (450, 700)
+
 # Database connection parameters
 DB_CONFIG = {
     "dbname": "Attendance",
@@ -34,98 +37,344 @@ DB_CONFIG = {
     "port": "5432"
 }
 
+# Connection pool sizing; a lecture hall scanning at once shares these
+POOL_CONFIG = {
+    "min_size": 2,
+    "max_size": 10,
+    "max_idle": 300,            # seconds before an idle extra connection is closed
+    "health_check_after": 30,   # seconds idle before a connection is pinged on reuse
+    "borrow_timeout": 5,
+}
+
+db_pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+
+# Seconds between incremental roster refreshes (Students / Enrollments)
+ROSTER_REFRESH_SECONDS = 60
+
+# Hours between checks that next months' Attendance partitions exist
+PARTITION_REFRESH_HOURS = 24
+
+# Seconds between Wi-Fi SSID re-checks (link changes trigger one sooner on Linux)
+NETWORK_REFRESH_SECONDS = 30
+
+# Large result sets are read through a server-side cursor, this many rows per batch
+STREAM_FETCH_SIZE = 500
+
+# Scans are written in bulk: flushed after this many ms or this many rows
+INGEST_CONFIG = {
+    "flush_interval_ms": 50,
+    "max_batch": 200,
+}
+
+# Scans are committed to a local SQLite journal and uploaded in the background
+# (utils/journal.py), so marking works while the database is slow or down.
+# False sends them straight to the ingest queue instead.
+OFFLINE_JOURNAL = True
+JOURNAL_CONFIG = {
+    "path": "attendance_journal.db",
+    "batch_size": 200,
+    "backoff_base": 1,          # seconds; doubles per failed upload up to backoff_max
+    "backoff_max": 60,
+    "failure_threshold": 3,     # failed uploads before the circuit breaker opens
+    "reset_seconds": 30,        # how long it stays open before a trial upload
+    "retention_hours": 24,      # synced marks are kept this long for duplicate checks
+    "server_retention_hours": 168,  # Synced_marks rows (retry idempotency) on the server
+}
+
+# QR scan loop tuning (see utils/scanner.py); adjust per camera / device
+SCAN_CONFIG = {
+    "grayscale": True,
+    "max_width": 640,       # frames wider than this are downscaled before decoding
+    "binarize": False,      # Otsu threshold; helps with glare, costs a little CPU
+    "track_roi": True,      # decode only around the last detected code
+    "roi_margin": 0.5,
+    "roi_lost_after": 5,    # frames without a hit before scanning the full frame again
+}
+
+# Capture/decode threading for the scanner (see ScanPipeline)
+SCAN_PIPELINE_CONFIG = {
+    "buffer_size": 2,        # frames held between capture and decode; oldest dropped
+    "decode_workers": 1,
+    "max_capture_fps": 30,
+    "max_decode_fps": 15,    # caps CPU use of the decoder
+}
+SCAN_DISPLAY_FPS = 30
+# Camera index, or a recorded video / image directory to replay (see utils/frame_sources.py)
+SCAN_SOURCE = 0
+
+# Kiosk mode: one teacher-side camera reads student codes ("STU:<roll_no>")
+STUDENT_QR_PREFIX = "STU:"
+KIOSK_SCAN_CONFIG = dict(SCAN_CONFIG, track_roi=False, max_width=960)  # many codes anywhere in frame
+KIOSK_PIPELINE_CONFIG = dict(SCAN_PIPELINE_CONFIG, decode_workers=2)
+KIOSK_DEDUPE_SECONDS = 300
+
+# QR codes are rendered in memory (utils/qr_render.py); saving a PNG copy is optional
+QR_RENDER_CONFIG = {"size": 200, "border": 4}
+STUDENT_QR_SIZE = 400
+QR_CACHE_SIZE = 64
+QR_SAVE_DIR = "qr_codes"    # saved / pre-generated codes (tools/qr_pregen.py)
+
+# Rotating signed session codes on the teacher dashboard (utils/session_tokens.py).
+# Every device that shows or scans codes must share the same secret; without
+# ATTENDANCE_TOKEN_SECRET no session codes are issued or accepted.
+SESSION_TOKEN_CONFIG = {
+    "secret": os.environ.get("ATTENDANCE_TOKEN_SECRET", ""),
+    "ttl_seconds": 30,      # how long a displayed code stays valid
+    "skew_seconds": 5,      # tolerated clock difference between devices
+}
+SESSION_TOKEN_ROTATE_SECONDS = 15
+SESSION_DEFAULT_MINUTES = 60
+ALLOW_PLAIN_CLASS_QR = False  # accept bare class-id codes (no expiry) from older printouts
+# accept PRT: session codes printed by tools/qr_pregen.py; they stay valid until
+# the session ends, so a photo of one works for the whole session
+ALLOW_PRINTED_SESSION_QR = False
+
+# Status codes returned by update_attendance / the mark_*attendance() SQL functions
+MARK_MARKED = "marked"
+MARK_DUPLICATE = "duplicate"
+MARK_NO_SESSION = "no_session"
+MARK_UNKNOWN_STUDENT = "unknown_student"
+MARK_ERROR = "error"
+MARK_QUEUED = "queued"      # saved in the local journal, not yet uploaded
+
 def get_db_connection():
-    return psycopg2.connect(**DB_CONFIG)
+    """Borrow a pooled connection; use as `with get_db_connection() as conn:`."""
+    return db_pool.connection()
+
+def warm_db_pool():
+    """Open the minimum pool connections in the background and start idle recycling."""
+    db_pool.warm_async()
+    db_pool.start_reaper()
+
+def start_partition_maintenance():
+    """Keep monthly Attendance partitions created ahead of time, in the background."""
+    from utils.migrations import start_partition_maintenance as start
+    start(get_db_connection, PARTITION_REFRESH_HOURS * 3600)
+
+roster = Roster(get_db_connection)
+
+def start_roster_refresh():
+    """Load the student roster in the background and keep it refreshed."""
+    roster.start_auto_refresh(ROSTER_REFRESH_SECONDS)
+
+def authenticate_student(roll_no, password):
+    """Check student credentials against the in-memory roster. Returns a StudentRecord or None."""
+    try:
+        return roster.authenticate(roll_no, password)
+    except Exception as e:
+        print(f"Error loading roster: {e}")
+        return None
+
+network_presence = NetworkPresence(refresh_interval=NETWORK_REFRESH_SECONDS)
+
+def start_network_presence():
+    """Start watching the Wi-Fi network in the background."""
+    network_presence.start()
+
+def get_student_by_roll(roll_no):
+    """StudentRecord for a roll number from the in-memory roster, or None."""
+    try:
+        roster.ensure_loaded()
+    except Exception as e:
+        print(f"Error loading roster: {e}")
+    return roster.get_by_roll(roll_no)
 
 def get_wifi_ssid():
-    """Call netsh and parse output (unchanged logic)."""
+    """Current Wi-Fi SSID from the in-memory network presence cache."""
+    return network_presence.ssid()
+
+
+def _load_active_session(class_name):
+    """Return (session_id, end_time, seconds_left) of the class's active session, or None."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT s.session_id, s.end_time, EXTRACT(EPOCH FROM (s.end_time - NOW()))
+                FROM Sessions s
+                JOIN Classes c ON s.class_id = c.class_id
+                WHERE c.class_name = %s AND s.is_active = TRUE
+                AND NOW() BETWEEN s.start_time AND s.end_time
+                ORDER BY s.start_time DESC
+                LIMIT 1
+            """, (class_name,))
+            return cur.fetchone()
+
+session_cache = ActiveSessionCache(_load_active_session)
+session_tokens = SessionTokenSigner(**SESSION_TOKEN_CONFIG)
+
+def get_active_session_id(class_name):
+    """Active session_id for a class name (cached until the session ends), or None."""
+    return session_cache.get(class_name)
+
+def get_session_cache_stats():
+    return session_cache.stats()
+
+def open_session(class_name, duration_minutes=60):
+    """Start a session of `class_name` now and cache it. Returns the session_id or None."""
     try:
-        result = subprocess.check_output(
-            "netsh wlan show interfaces", shell=True
-        ).decode("utf-8", errors="ignore")
-        for line in result.split("\n"):
-            if "SSID" in line and ":" in line:
-                return line.split(":", 1)[1].strip()
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO Sessions (class_id, start_time, end_time, is_active)
+                    SELECT class_id, NOW(), NOW() + %s * INTERVAL '1 minute', TRUE
+                    FROM Classes
+                    WHERE class_name = %s
+                    RETURNING session_id, end_time, EXTRACT(EPOCH FROM (end_time - NOW()))
+                """, (duration_minutes, class_name))
+                row = cur.fetchone()
     except Exception as e:
-        print("Error getting WiFi SSID:", e)
-    return None
+        print(f"Error opening session: {e}")
+        session_cache.invalidate(class_name)
+        return None
+    if not row:
+        return None
+    session_cache.put(class_name, *row)
+    return row[0]
+
+def ensure_session(class_name, duration_minutes=SESSION_DEFAULT_MINUTES):
+    """Active session_id of `class_name`, opening a new session if there is none."""
+    return get_active_session_id(class_name) or open_session(class_name, duration_minutes)
 
+def get_scheduled_sessions():
+    """
+    (session_id, class_name, start_time, end_time) of every session that has
+    not ended yet. end_time is timezone-aware (read in the database's time
+    zone, like the NOW() comparisons), so end_time.timestamp() is exact.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT s.session_id, c.class_name, s.start_time, s.end_time::timestamptz
+                FROM Sessions s
+                JOIN Classes c ON s.class_id = c.class_id
+                WHERE s.is_active = TRUE AND s.end_time > NOW()
+                ORDER BY s.start_time, c.class_name
+            """)
+            return cur.fetchall()
 
-def update_attendance(student_name, subject):
-    """Mark attendance in PostgreSQL database"""
+def close_session(class_name):
+    """End every active session of `class_name` now and drop it from the cache."""
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                # Get student_id
-                cur.execute("SELECT student_id FROM Students WHERE name = %s", (student_name,))
-                student_result = cur.fetchone()
-                if not student_result:
-                    return False
-                student_id = student_result[0]
-
-                # Get active session for the class
                 cur.execute("""
-                    SELECT s.session_id 
-                    FROM Sessions s
-                    JOIN Classes c ON s.class_id = c.class_id
-                    WHERE c.class_name = %s AND s.is_active = TRUE
-                    AND NOW() BETWEEN s.start_time AND s.end_time
-                """, (subject,))
-                session_result = cur.fetchone()
-                if not session_result:
-                    return False
-                session_id = session_result[0]
-
-                # Insert attendance record
-                try:
-                    cur.execute("""
-                        INSERT INTO Attendance (session_id, student_id, marked_at)
-                        VALUES (%s, %s, CURRENT_TIMESTAMP)
-                    """, (session_id, student_id))
-                    conn.commit()
-                    return True
-                except psycopg2.IntegrityError:
-                    # Attendance already marked
-                    return False
+                    UPDATE Sessions s
+                    SET is_active = FALSE, end_time = LEAST(s.end_time, NOW())
+                    FROM Classes c
+                    WHERE s.class_id = c.class_id AND c.class_name = %s AND s.is_active = TRUE
+                """, (class_name,))
+                return cur.rowcount
+    except Exception as e:
+        print(f"Error closing session: {e}")
+        return 0
+    finally:
+        session_cache.invalidate(class_name)
+
+def update_attendance(student_id, subject):
+    """
+    Mark attendance in PostgreSQL. The student comes from the roster and the
+    active session from the session cache, so a cache hit costs a single
+    mark_session_attendance() call. Returns one of the MARK_* status codes.
+    """
+    if roster.loaded and roster.get(student_id) is None:
+        return MARK_UNKNOWN_STUDENT
+    try:
+        session_id = get_active_session_id(subject)
+        if session_id is None:
+            return MARK_NO_SESSION
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT mark_session_attendance(%s, %s)", (student_id, session_id))
+                status = cur.fetchone()[0]
+        if status == MARK_NO_SESSION:
+            # closed or cut short since it was cached (possibly by another device)
+            session_cache.invalidate(subject)
+        return status
     except Exception as e:
         print(f"Error marking attendance: {e}")
-        return False
+        return MARK_ERROR
+
+_ingest_queue = None
+_ingest_lock = threading.Lock()
+
+def get_ingest_queue():
+    """Return the shared AttendanceIngestQueue, starting it on first use."""
+    global _ingest_queue
+    with _ingest_lock:
+        if _ingest_queue is None:
+            from utils.ingest import AttendanceIngestQueue
+            _ingest_queue = AttendanceIngestQueue(
+                get_db_connection, get_active_session_id, session_cache.invalidate,
+                **INGEST_CONFIG
+            )
+        return _ingest_queue
+
+_journal = None
+
+def get_journal():
+    """Return the shared AttendanceJournal, starting its syncer on first use."""
+    global _journal
+    with _ingest_lock:
+        if _journal is None:
+            from utils.journal import AttendanceJournal
+            _journal = AttendanceJournal(
+                connection_factory=get_db_connection,
+                invalidate_session=session_cache.invalidate,
+                session_hint=session_cache.peek,
+                **JOURNAL_CONFIG
+            )
+        return _journal
+
+def close_attendance_writers(timeout=2):
+    """Upload or flush whatever marks are still waiting (call on app exit)."""
+    for writer in (_journal, _ingest_queue):
+        if writer is not None:
+            writer.close(timeout)
 
-def get_student_attendance(student_name):
-    """Get attendance summary for a student"""
+def submit_attendance(student_id, subject, callback=None, session_id=None):
+    """
+    Record a mark. With OFFLINE_JOURNAL the Future is resolved at once with
+    MARK_QUEUED (or MARK_DUPLICATE); otherwise it resolves to the final MARK_*
+    status after the next bulk flush. `callback(status)` is also called once
+    the status is known. Pass the session_id from a verified session token to
+    skip the session lookup.
+    """
+    if roster.loaded and roster.get(student_id) is None:
+        future = Future()
+        if callback:
+            future.add_done_callback(lambda f: callback(f.result()))
+        future.set_result(MARK_UNKNOWN_STUDENT)
+        return future
+    writer = get_journal() if OFFLINE_JOURNAL else get_ingest_queue()
+    return writer.submit(student_id, subject, callback, session_id)
+
+def get_student_attendance(student_id):
+    """Get attendance summary for a student (read from Attendance_counts)"""
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
-                    SELECT c.class_name, COUNT(a.attendance_id) as attended_classes
-                    FROM Students s
-                    JOIN Enrollments e ON s.student_id = e.student_id
-                    JOIN Classes c ON e.class_id = c.class_id
-                    LEFT JOIN Sessions ses ON c.class_id = ses.class_id
-                    LEFT JOIN Attendance a ON ses.session_id = a.session_id 
-                        AND a.student_id = s.student_id
-                    WHERE s.name = %s
-                    GROUP BY c.class_name
-                """, (student_name,))
+                    SELECT c.class_name, ac.attended
+                    FROM Attendance_counts ac
+                    JOIN Classes c ON c.class_id = ac.class_id
+                    WHERE ac.student_id = %s
+                    ORDER BY c.class_name
+                """, (student_id,))
                 return cur.fetchall()
     except Exception as e:
         print(f"Error getting attendance: {e}")
         return []
 
 def get_all_attendance():
-    """Get attendance for all students"""
+    """Get attendance for all students (read from Attendance_counts)"""
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
-                    SELECT s.name, c.class_name, COUNT(a.attendance_id) as attended_classes
-                    FROM Students s
-                    JOIN Enrollments e ON s.student_id = e.student_id
-                    JOIN Classes c ON e.class_id = c.class_id
-                    LEFT JOIN Sessions ses ON c.class_id = ses.class_id
-                    LEFT JOIN Attendance a ON ses.session_id = a.session_id 
-                        AND a.student_id = s.student_id
-                    GROUP BY s.name, c.class_name
+                    SELECT s.name, c.class_name, ac.attended
+                    FROM Attendance_counts ac
+                    JOIN Students s ON s.student_id = ac.student_id
+                    JOIN Classes c ON c.class_id = ac.class_id
                     ORDER BY s.name, c.class_name
                 """)
                 return cur.fetchall()
@@ -133,6 +382,90 @@ def get_all_attendance():
         print(f"Error getting all attendance: {e}")
         return []
 
+def _stream_query(cursor_name, query, params=None, batch_size=STREAM_FETCH_SIZE):
+    """
+    Run `query` on a named (server-side) cursor and yield lists of at most
+    `batch_size` rows, so only one batch is held in memory at a time. The
+    pooled connection is kept until the generator is exhausted or closed.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor(name=cursor_name) as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+
+def iter_all_attendance(batch_size=STREAM_FETCH_SIZE):
+    """Same rows as get_all_attendance(), streamed in batches (see _stream_query)."""
+    return _stream_query("all_attendance", """
+        SELECT s.name, c.class_name, ac.attended
+        FROM Attendance_counts ac
+        JOIN Students s ON s.student_id = ac.student_id
+        JOIN Classes c ON c.class_id = ac.class_id
+        ORDER BY s.name, c.class_name
+    """, batch_size=batch_size)
+
+def iter_class_attendance(class_names, batch_size=STREAM_FETCH_SIZE):
+    """
+    Attendance for the given classes only, pivoted in the database to one row
+    per student: (roll_no, name, <attended per class>..., attended, held,
+    percentage). The per-class columns are left out for a single class, where
+    they would repeat `attended`. Streamed in batches like iter_all_attendance().
+
+    `held` counts sessions that have started, counted at query time:
+    Class_session_counts also includes sessions scheduled for later.
+    """
+    class_names = list(class_names)
+    per_class = ""
+    params = [class_names]
+    if len(class_names) > 1:
+        per_class = "".join(
+            "COALESCE(MAX(ac.attended) FILTER (WHERE c.class_name = %s), 0), "
+            for _ in class_names
+        )
+        params.extend(class_names)
+    params.append(class_names)
+    return _stream_query("class_attendance", f"""
+        WITH held AS (
+            SELECT ses.class_id, COUNT(*) AS sessions
+            FROM Sessions ses
+            JOIN Classes c ON c.class_id = ses.class_id
+            WHERE c.class_name = ANY(%s) AND ses.start_time <= NOW()
+            GROUP BY ses.class_id
+        )
+        SELECT s.roll_no, s.name, {per_class}
+               SUM(ac.attended),
+               SUM(COALESCE(h.sessions, 0)),
+               COALESCE(ROUND(100.0 * SUM(ac.attended)
+                              / NULLIF(SUM(COALESCE(h.sessions, 0)), 0), 1), 0)
+        FROM Attendance_counts ac
+        JOIN Students s ON s.student_id = ac.student_id
+        JOIN Classes c ON c.class_id = ac.class_id
+        LEFT JOIN held h ON h.class_id = ac.class_id
+        WHERE c.class_name = ANY(%s)
+        GROUP BY s.student_id, s.roll_no, s.name
+        ORDER BY s.name
+    """, params, batch_size)
+
+def verify_attendance_counters():
+    """
+    Compare the counter tables with the base tables.
+    Returns a list of (kind, student_id, class_id, expected, actual) drift rows.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM attendance_counter_drift()")
+            return cur.fetchall()
+
+def rebuild_attendance_counters():
+    """Recompute Attendance_counts and Class_session_counts from the base tables."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT rebuild_attendance_counters()")
+
 # def ensure_attendance_csv():
 #     """Create CSV with zeroed subjects if missing (unchanged behavior)."""
 #     if not os.path.exists(CSV_FILE):
@@ -0,0 +1,143 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from psycopg2.extras import execute_values
+
+from utils.helpers import MARK_MARKED, MARK_DUPLICATE, MARK_NO_SESSION, MARK_ERROR
+
+# One statement marks the whole batch; each row goes through
+# mark_session_attendance() so validation and duplicate handling match the
+# single-scan path.
+BATCH_MARK_SQL = """
+    SELECT req.idx, mark_session_attendance(req.student_id, req.session_id)
+    FROM (VALUES %s) AS req(idx, student_id, session_id)
+    ORDER BY req.idx
+"""
+
+
+class AttendanceIngestQueue:
+    """
+    Collects mark requests from many scans and writes them to PostgreSQL in
+    bulk: one statement and one commit per flush instead of one per scan.
+
+    A flush happens `flush_interval_ms` after the first queued request or as
+    soon as `max_batch` requests are waiting, whichever comes first. Each
+    caller gets a Future resolving to its own MARK_* status.
+
+    `session_resolver(class_name)` maps a class to its active session_id (or
+    None) unless the caller already knows it (e.g. from a signed session
+    token); `invalidate_session(class_name)` is called when the database
+    reports that a resolved session is no longer active.
+    """
+    def __init__(self, connection_factory, session_resolver, invalidate_session,
+                 flush_interval_ms=50, max_batch=200):
+        self.connection_factory = connection_factory
+        self.session_resolver = session_resolver
+        self.invalidate_session = invalidate_session
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._cond = threading.Condition()
+        self._pending = []      # list of (student_id, subject, session_id, future)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="attendance-ingest", daemon=True)
+        self._thread.start()
+
+    def submit(self, student_id, subject, callback=None, session_id=None):
+        """
+        Queue one mark; `callback(status)` runs on the ingest thread when done.
+        `session_id` skips the session lookup when it is already known.
+        """
+        future = Future()
+        if callback:
+            future.add_done_callback(lambda f: callback(f.result()))
+        with self._cond:
+            if self._closed:
+                future.set_result(MARK_ERROR)
+                return future
+            self._pending.append((student_id, subject, session_id, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def close(self, timeout=None):
+        """Stop accepting requests and flush whatever is still queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    # ---------------- flush loop ----------------
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._flush(batch)
+            except Exception as e:
+                print(f"Error in attendance ingest flush: {e}")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_result(MARK_ERROR)
+
+    def _flush(self, batch):
+        # coalesce repeated scans of the same student/class inside the batch
+        waiters = {}
+        for student_id, subject, session_id, future in batch:
+            # a caller that cancelled its Future no longer wants the mark
+            if not future.set_running_or_notify_cancel():
+                continue
+            waiters.setdefault((student_id, subject, session_id), []).append(future)
+        keys = list(waiters)
+
+        statuses = {}
+        rows = []
+        for idx, (student_id, subject, session_id) in enumerate(keys):
+            try:
+                if session_id is None:
+                    session_id = self.session_resolver(subject)
+            except Exception as e:
+                print(f"Error resolving session for {subject}: {e}")
+                statuses[idx] = MARK_ERROR
+                continue
+            if session_id is None:
+                statuses[idx] = MARK_NO_SESSION
+            else:
+                rows.append((idx, student_id, session_id))
+
+        if rows:
+            try:
+                with self.connection_factory() as conn:
+                    with conn.cursor() as cur:
+                        results = execute_values(cur, BATCH_MARK_SQL, rows,
+                                                 page_size=len(rows), fetch=True)
+                statuses.update(results)
+            except Exception as e:
+                print(f"Error flushing attendance batch of {len(rows)}: {e}")
+
+        for idx, key in enumerate(keys):
+            status = statuses.get(idx, MARK_ERROR)
+            if status == MARK_NO_SESSION:
+                self.invalidate_session(key[1])
+            first, *repeats = waiters[key]
+            first.set_result(status)
+            for future in repeats:
+                future.set_result(MARK_DUPLICATE if status == MARK_MARKED else status)
@@ -0,0 +1,276 @@
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+from psycopg2.extras import execute_values
+
+from utils.helpers import MARK_QUEUED, MARK_DUPLICATE, MARK_NO_SESSION, MARK_ERROR
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS marks (
+    mark_id     INTEGER PRIMARY KEY,
+    student_id  INTEGER NOT NULL,
+    subject     TEXT NOT NULL,
+    session_id  INTEGER,            -- NULL when not known at scan time; the server
+                                    -- resolves it from subject and scanned_at
+    scanned_at  REAL NOT NULL,      -- unix time
+    status      TEXT,               -- NULL until synced, then the server's MARK_* status
+    synced_at   REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS marks_student_session
+    ON marks (student_id, session_id) WHERE session_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS marks_unsynced
+    ON marks (mark_id) WHERE status IS NULL;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# (device_id, mark_id) makes a retried batch idempotent: the server returns
+# the status it recorded the first time instead of marking again.
+SYNC_MARKS_SQL = """
+    SELECT req.mark_id,
+           sync_offline_mark(req.device_id, req.mark_id, req.student_id, req.class_name,
+                             req.session_id, to_timestamp(req.scanned_at)::timestamp)
+    FROM (VALUES %s) AS req(mark_id, device_id, student_id, class_name, session_id, scanned_at)
+    ORDER BY req.mark_id
+"""
+SYNC_MARKS_TEMPLATE = "(%s::bigint, %s, %s::int, %s, %s::int, %s::float8)"
+
+# The server's (device_id, mark_id) results only guard against retried batches
+PRUNE_SYNCED_SQL = "SELECT prune_synced_marks(%s * INTERVAL '1 hour')"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency that keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    allow() is False for `reset_seconds`. Then a single trial call is let
+    through (half-open): success closes the breaker, failure opens it again.
+    """
+    def __init__(self, failure_threshold=3, reset_seconds=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self._opened_at = None
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self.retry_in() == 0 else "open"
+
+    def allow(self):
+        return self.state != "open"
+
+    def retry_in(self):
+        """Seconds until the next call is allowed (0 when it is allowed now)."""
+        if self._opened_at is None:
+            return 0
+        return max(self._opened_at + self.reset_seconds - self.clock(), 0)
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = self.clock()
+
+
+class AttendanceJournal:
+    """
+    Offline-first attendance writes: every scan is committed to a local
+    SQLite journal (WAL mode) and acknowledged straight away, and a syncer
+    thread uploads the journal to PostgreSQL in batches.
+
+    submit() has the same signature as AttendanceIngestQueue.submit() but its
+    Future resolves before any network I/O, to MARK_QUEUED for a new mark or
+    MARK_DUPLICATE when this device already holds a mark for the same
+    student and session. The server's final status is stored in the journal.
+
+    Failed uploads are retried with exponential backoff and jitter, and a
+    CircuitBreaker stops hammering a database that is down. A mark carries
+    its class and scan time; when the session was not known on the device,
+    sync_offline_mark() picks the class's session that contains the scan
+    time. Either way marks still count when they reach the server after the
+    session has ended.
+    """
+    def __init__(self, path, connection_factory, invalidate_session,
+                 session_hint=None, batch_size=200, backoff_base=1, backoff_max=60,
+                 failure_threshold=3, reset_seconds=30, retention_hours=24,
+                 server_retention_hours=168, synchronous="NORMAL"):
+        self.path = path
+        self.connection_factory = connection_factory
+        self.invalidate_session = invalidate_session
+        self.session_hint = session_hint or (lambda class_name: None)
+        self.batch_size = batch_size
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retention = retention_hours * 3600
+        self.server_retention_hours = server_retention_hours
+        self._next_server_prune = 0.0
+        self.synchronous = synchronous
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+
+        self._db = self._connect(check_same_thread=False)
+        self._db.executescript(JOURNAL_SCHEMA)
+        self.device_id = self._device_id()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self.last_error = None
+        self.last_sync_at = None
+        self._thread = threading.Thread(target=self._run, name="attendance-journal", daemon=True)
+        self._thread.start()
+
+    def _connect(self, check_same_thread=True):
+        db = sqlite3.connect(self.path, isolation_level=None, timeout=5,
+                             check_same_thread=check_same_thread)
+        db.execute("PRAGMA journal_mode=WAL")
+        # NORMAL in WAL mode survives an app crash and skips the fsync per commit
+        db.execute(f"PRAGMA synchronous={self.synchronous}")
+        return db
+
+    def _device_id(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'device_id'").fetchone()
+        if row:
+            return row[0]
+        self._db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('device_id', ?)",
+                         (uuid.uuid4().hex,))
+        return self._db.execute("SELECT value FROM meta WHERE key = 'device_id'").fetchone()[0]
+
+    # ---------------- writes ----------------
+    def submit(self, student_id, subject, callback=None, session_id=None):
+        """
+        Journal one mark; the returned Future is already resolved.
+        `callback(status)` is called on the calling thread.
+        """
+        future = Future()
+        if callback:
+            future.add_done_callback(lambda f: callback(f.result()))
+        if session_id is None:
+            # only what is already cached; a database lookup would defeat the point
+            session_id = self.session_hint(subject)
+        try:
+            with self._write_lock:
+                cur = self._db.execute(
+                    "INSERT OR IGNORE INTO marks (student_id, subject, session_id, scanned_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (student_id, subject, session_id, time.time()),
+                )
+            status = MARK_QUEUED if cur.rowcount else MARK_DUPLICATE
+        except sqlite3.Error as e:
+            print(f"Error writing attendance journal: {e}")
+            status = MARK_ERROR
+        if status == MARK_QUEUED:
+            self._wakeup.set()
+        future.set_result(status)
+        return future
+
+    def close(self, timeout=None):
+        """Stop the syncer after one last upload attempt."""
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        with self._write_lock:
+            self._db.close()
+
+    # ---------------- sync loop ----------------
+    def _run(self):
+        db = self._connect()
+        delay = 0       # sync whatever an earlier run left behind
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                try:
+                    delay = self._sync_once(db)
+                except sqlite3.Error as e:
+                    print(f"Error reading attendance journal: {e}")
+                    delay = self.backoff_max
+            if self.breaker.allow():
+                self._sync_once(db)
+        finally:
+            db.close()
+
+    def _sync_once(self, db):
+        """Upload one batch. Returns seconds to wait before the next try, or None to wait for new marks."""
+        rows = db.execute(
+            "SELECT mark_id, student_id, subject, session_id, scanned_at FROM marks "
+            "WHERE status IS NULL ORDER BY mark_id LIMIT ?", (self.batch_size,)
+        ).fetchall()
+        if not rows:
+            self._prune(db)
+            if self.breaker.allow() and time.monotonic() >= self._next_server_prune:
+                self._prune_server()
+            return None
+        if not self.breaker.allow():
+            return self.breaker.retry_in()
+
+        try:
+            statuses = self._upload(rows)
+        except Exception as e:
+            self.breaker.record_failure()
+            self.last_error = str(e)
+            backoff = min(self.backoff_max, self.backoff_base * 2 ** (self.breaker.failures - 1))
+            delay = max(backoff * random.uniform(0.5, 1.0), self.breaker.retry_in())
+            print(f"Attendance sync failed ({len(rows)} marks waiting), retrying in {delay:.1f}s: {e}")
+            return delay
+        self.breaker.record_success()
+        self.last_error = None
+
+        now = time.time()
+        db.execute("BEGIN")
+        db.executemany("UPDATE marks SET status = ?, synced_at = ? WHERE mark_id = ?",
+                       [(status, now, mark_id) for mark_id, status in statuses.items()])
+        db.execute("COMMIT")
+        self.last_sync_at = now
+        for mark_id, student_id, subject, _, _ in rows:
+            if statuses[mark_id] == MARK_NO_SESSION:
+                self.invalidate_session(subject)
+        return 0    # check for more straight away
+
+    def _upload(self, rows):
+        """Send one batch to PostgreSQL; returns {mark_id: status}."""
+        values = [(mark_id, self.device_id, student_id, subject, session_id, scanned_at)
+                  for mark_id, student_id, subject, session_id, scanned_at in rows]
+        with self.connection_factory() as conn:
+            with conn.cursor() as cur:
+                results = execute_values(cur, SYNC_MARKS_SQL, values,
+                                         template=SYNC_MARKS_TEMPLATE,
+                                         page_size=len(values), fetch=True)
+        return dict(results)
+
+    def _prune(self, db):
+        db.execute("DELETE FROM marks WHERE status IS NOT NULL AND synced_at < ?",
+                   (time.time() - self.retention,))
+
+    def _prune_server(self):
+        """Drop old Synced_marks entries (every device does this, at most hourly)."""
+        self._next_server_prune = time.monotonic() + 3600
+        try:
+            with self.connection_factory() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(PRUNE_SYNCED_SQL, (self.server_retention_hours,))
+        except Exception as e:
+            print(f"Error pruning synced marks: {e}")
+
+    # ---------------- status ----------------
+    def stats(self):
+        with self._write_lock:
+            pending = self._db.execute("SELECT COUNT(*) FROM marks WHERE status IS NULL").fetchone()[0]
+        return {
+            "pending": pending,
+            "breaker": self.breaker.state,
+            "last_sync_at": self.last_sync_at,
+            "last_error": self.last_error,
+        }
+
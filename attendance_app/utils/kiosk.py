@@ -0,0 +1,116 @@
+import threading
+import time
+
+from utils.helpers import (
+    STUDENT_QR_PREFIX,
+    MARK_MARKED,
+    MARK_DUPLICATE,
+    MARK_UNKNOWN_STUDENT,
+    MARK_QUEUED,
+)
+
+
+def parse_student_payload(data):
+    """Return the roll number encoded in a student QR code, or None for other codes."""
+    if data.startswith(STUDENT_QR_PREFIX):
+        return data[len(STUDENT_QR_PREFIX):].strip() or None
+    return None
+
+
+class SlidingWindowDeduper:
+    """
+    Remembers keys for `window_seconds`. seen() only checks; record() starts
+    the window, so callers record a key once its outcome is final.
+    """
+    def __init__(self, window_seconds=300, clock=time.monotonic):
+        self.window = window_seconds
+        self.clock = clock
+        self._last_seen = {}
+        self._next_prune = 0.0
+
+    def seen(self, key):
+        now = self.clock()
+        if now >= self._next_prune:
+            cutoff = now - self.window
+            self._last_seen = {k: t for k, t in self._last_seen.items() if t > cutoff}
+            self._next_prune = now + self.window
+        last = self._last_seen.get(key)
+        return last is not None and now - last < self.window
+
+    def record(self, key):
+        self._last_seen[key] = self.clock()
+
+
+class KioskSession:
+    """
+    Continuous check-in for one class session from a single entrance camera.
+
+    The session is resolved (or opened) once, before the kiosk starts; it is
+    None when the database was unreachable, and the offline journal then
+    records class and scan time for the server to match up later. Every
+    student code in every frame goes through handle(). A student with a
+    mark in flight is skipped, and so is one whose mark succeeded (or was
+    already there) inside the dedupe window. The rest are handed to
+    `submit(student_id, class_id, callback, session_id)`, which journals or
+    batches them. A mark that fails is not remembered, so the next frame
+    retries it. Counters are updated as results come back.
+    """
+    # outcomes after which the student is left alone for the dedupe window
+    FINAL_STATUSES = (MARK_MARKED, MARK_DUPLICATE, MARK_QUEUED)
+
+    def __init__(self, class_id, session_id, resolve_student, submit, window_seconds=300):
+        self.class_id = class_id
+        self.session_id = session_id
+        self.resolve_student = resolve_student
+        self.submit = submit
+        self.deduper = SlidingWindowDeduper(window_seconds)
+        self.counts = {MARK_MARKED: 0, MARK_DUPLICATE: 0, "rejected": 0, "pending": 0}
+        self.last_marked = None
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def handle(self, detections):
+        for detection in detections:
+            roll_no = parse_student_payload(detection.data)
+            if roll_no is None:
+                continue
+            student = self.resolve_student(roll_no)
+            key = roll_no if student is None else student.student_id
+            with self._lock:
+                if key in self._in_flight or self.deduper.seen(key):
+                    continue
+                if student is None:
+                    # nothing to retry until the roster changes
+                    self.deduper.record(key)
+                else:
+                    self._in_flight.add(key)
+                    self.counts["pending"] += 1
+            if student is None:
+                self._count(MARK_UNKNOWN_STUDENT)
+                continue
+            self.submit(student.student_id, self.class_id, session_id=self.session_id,
+                        callback=lambda status, s=student: self._on_result(s, status))
+
+    def _on_result(self, student, status):
+        with self._lock:
+            self._in_flight.discard(student.student_id)
+            self.counts["pending"] -= 1
+            if status in self.FINAL_STATUSES:
+                self.deduper.record(student.student_id)
+            if status == MARK_QUEUED:
+                # saved in the offline journal; the upload happens later
+                status = MARK_MARKED
+            if status == MARK_MARKED:
+                self.last_marked = student.name
+        self._count(status)
+
+    def _count(self, status):
+        with self._lock:
+            key = status if status in (MARK_MARKED, MARK_DUPLICATE) else "rejected"
+            self.counts[key] += 1
+
+    def summary(self):
+        with self._lock:
+            return (f"Marked: {self.counts[MARK_MARKED]}  "
+                    f"Already: {self.counts[MARK_DUPLICATE]}  "
+                    f"Rejected: {self.counts['rejected']}")
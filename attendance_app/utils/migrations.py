@@ -0,0 +1,180 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+from utils.roster import PASSWORD_HASH_PREFIX, hash_password
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+MIGRATION_FILE_RE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+# Any constant works; it only has to be the same for every runner
+MIGRATION_LOCK_ID = 7_402_811
+
+# Monthly Attendance partitions are kept this far ahead of today
+PARTITION_MONTHS_AHEAD = 3
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def checksum(self):
+        return hashlib.sha256(self.read().encode("utf-8")).hexdigest()
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Return the NNNN_name.sql files in `directory`, ordered by version."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_RE.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2),
+                                        os.path.join(directory, filename)))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def ensure_migrations_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_migrations(cur):
+    """Return {version: (name, checksum)} for migrations already in the database."""
+    ensure_migrations_table(cur)
+    cur.execute("SELECT version, name, checksum FROM schema_migrations")
+    return {version: (name, checksum) for version, name, checksum in cur.fetchall()}
+
+
+def migration_status(conn, directory=MIGRATIONS_DIR):
+    """Return a list of (migration, state) with state 'applied', 'pending' or 'modified'."""
+    with conn.cursor() as cur:
+        applied = applied_migrations(cur)
+    conn.commit()
+    status = []
+    for migration in discover_migrations(directory):
+        if migration.version not in applied:
+            state = "pending"
+        elif applied[migration.version][1] != migration.checksum():
+            state = "modified"
+        else:
+            state = "applied"
+        status.append((migration, state))
+    return status
+
+
+def migrate(conn, target=None, directory=MIGRATIONS_DIR):
+    """
+    Apply pending migrations up to `target` (all by default), each in its own
+    transaction. An advisory lock keeps two runners from racing.
+    Returns the list of migrations applied.
+    """
+    done = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            applied = applied_migrations(cur)
+            conn.commit()
+            for migration in discover_migrations(directory):
+                if target is not None and migration.version > target:
+                    break
+                if migration.version in applied:
+                    if applied[migration.version][1] != migration.checksum():
+                        print(f"Warning: migration {migration.version:04d}_{migration.name} "
+                              "was edited after it was applied")
+                    continue
+                try:
+                    cur.execute(migration.read())
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                        (migration.version, migration.name, migration.checksum()),
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    raise MigrationError(
+                        f"Migration {migration.version:04d}_{migration.name} failed: {e}"
+                    ) from e
+                done.append(migration)
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+    return done
+
+
+def ensure_partitions(conn, months_ahead=PARTITION_MONTHS_AHEAD):
+    """
+    Create monthly Attendance partitions from this month to `months_ahead`
+    ahead. Returns False if the schema predates partitioning.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regproc('ensure_attendance_partitions')")
+        if cur.fetchone()[0] is None:
+            conn.rollback()
+            return False
+        cur.execute(
+            "SELECT ensure_attendance_partitions(CURRENT_DATE, "
+            "(CURRENT_DATE + %s * INTERVAL '1 month')::DATE)",
+            (months_ahead,),
+        )
+    conn.commit()
+    return True
+
+
+def hash_legacy_passwords(conn):
+    """
+    Hash Students.password_hash values still stored as plain text (rows
+    imported from the old hardcoded dict). Returns the number of rows hashed.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT student_id, password_hash FROM Students "
+            "WHERE left(password_hash, %s) <> %s FOR UPDATE",
+            (len(PASSWORD_HASH_PREFIX), PASSWORD_HASH_PREFIX),
+        )
+        rows = cur.fetchall()
+        for student_id, password in rows:
+            cur.execute("UPDATE Students SET password_hash = %s WHERE student_id = %s",
+                        (hash_password(password), student_id))
+    conn.commit()
+    return len(rows)
+
+
+def start_partition_maintenance(connection_factory, interval=24 * 3600,
+                                months_ahead=PARTITION_MONTHS_AHEAD):
+    """
+    Run ensure_partitions() now, then every `interval` seconds on a daemon
+    thread, so new months get their partition without a manual migrate.
+    """
+    def loop():
+        while True:
+            try:
+                with connection_factory() as conn:
+                    ensure_partitions(conn, months_ahead)
+            except Exception as e:
+                print(f"Error creating attendance partitions: {e}")
+            time.sleep(interval)
+    t = threading.Thread(target=loop, name="partition-maintenance", daemon=True)
+    t.start()
+    return t
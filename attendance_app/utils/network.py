@@ -0,0 +1,154 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+SUBPROCESS_TIMEOUT = 3
+
+
+def _run(args):
+    return subprocess.run(
+        args, capture_output=True, timeout=SUBPROCESS_TIMEOUT, check=True
+    ).stdout.decode("utf-8", errors="ignore")
+
+
+# ---------- SSID backends ----------
+class NetshBackend:
+    """Windows: `netsh wlan show interfaces`."""
+    name = "netsh"
+
+    def available(self):
+        return sys.platform.startswith("win") and shutil.which("netsh") is not None
+
+    def current_ssid(self):
+        for line in _run(["netsh", "wlan", "show", "interfaces"]).splitlines():
+            key, sep, value = line.partition(":")
+            # skip the BSSID line, which also contains "SSID"
+            if sep and key.strip() == "SSID":
+                return value.strip() or None
+        return None
+
+
+class NmcliBackend:
+    """Linux with NetworkManager: `nmcli -t -f active,ssid dev wifi`."""
+    name = "nmcli"
+
+    def available(self):
+        return sys.platform.startswith("linux") and shutil.which("nmcli") is not None
+
+    def current_ssid(self):
+        for line in _run(["nmcli", "-t", "-f", "active,ssid", "dev", "wifi"]).splitlines():
+            active, sep, ssid = line.partition(":")
+            if sep and active == "yes":
+                # terse mode escapes ':' inside the SSID
+                return ssid.replace("\\:", ":") or None
+        return None
+
+
+class IwBackend:
+    """Linux without NetworkManager: `iw dev <iface> link` for each wireless interface."""
+    name = "iw"
+
+    def available(self):
+        return sys.platform.startswith("linux") and shutil.which("iw") is not None
+
+    def current_ssid(self):
+        for iface in wireless_interfaces():
+            for line in _run(["iw", "dev", iface, "link"]).splitlines():
+                line = line.strip()
+                if line.startswith("SSID:"):
+                    return line[len("SSID:"):].strip() or None
+        return None
+
+
+def wireless_interfaces(sys_net="/sys/class/net"):
+    """Names of wireless interfaces, from sysfs (Linux only)."""
+    try:
+        return sorted(
+            iface for iface in os.listdir(sys_net)
+            if os.path.isdir(os.path.join(sys_net, iface, "wireless"))
+        )
+    except OSError:
+        return []
+
+
+def sysfs_link_state(sys_net="/sys/class/net"):
+    """
+    Cheap fingerprint of the wireless link state (operstate + carrier of each
+    wireless interface). Reading it costs a few file reads, no subprocess, so
+    it can be polled every second to notice network changes.
+    """
+    state = []
+    for iface in wireless_interfaces(sys_net):
+        values = [iface]
+        for attr in ("operstate", "carrier"):
+            try:
+                with open(os.path.join(sys_net, iface, attr)) as f:
+                    values.append(f.read().strip())
+            except OSError:
+                values.append("")
+        state.append(tuple(values))
+    return tuple(state)
+
+
+def default_backends():
+    """SSID backends usable on this machine, in order of preference."""
+    candidates = [NetshBackend(), NmcliBackend(), IwBackend()]
+    return [b for b in candidates if b.available()]
+
+
+# ---------- Cached provider ----------
+class NetworkPresence:
+    """
+    Keeps the current Wi-Fi SSID in memory.
+
+    A daemon thread re-queries the SSID every `refresh_interval` seconds, and
+    sooner when the sysfs link state changes (Linux), so ssid() is just an
+    attribute read on the scan path.
+    """
+    def __init__(self, backends=None, refresh_interval=30, poll_interval=1):
+        self.backends = default_backends() if backends is None else backends
+        self.refresh_interval = refresh_interval
+        self.poll_interval = poll_interval
+        self._ssid = None
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def ssid(self):
+        """Last known SSID (None if not connected or unknown). Blocks only before the first refresh."""
+        if self._refreshed_at is None:
+            self.refresh()
+        return self._ssid
+
+    def refresh(self):
+        with self._lock:
+            ssid = None
+            for backend in self.backends:
+                try:
+                    ssid = backend.current_ssid()
+                    break
+                except Exception as e:
+                    print(f"Error getting WiFi SSID via {backend.name}:", e)
+            self._ssid = ssid
+            self._refreshed_at = time.monotonic()
+            return ssid
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="network-presence", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def _watch(self):
+        link_state = sysfs_link_state()
+        self.refresh()
+        while True:
+            time.sleep(self.poll_interval)
+            new_state = sysfs_link_state()
+            stale = time.monotonic() - self._refreshed_at >= self.refresh_interval
+            if new_state != link_state or stale:
+                link_state = new_state
+                self.refresh()
@@ -0,0 +1,151 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import qrcode
+from PIL import Image as PILImage
+
+
+def render_qr_png(payload, size=200, border=4, fill_color="black", back_color="white"):
+    """
+    Render `payload` as PNG bytes of exactly size x size pixels, without
+    touching the disk. The box size is picked to land near the target and
+    the last step is a nearest-neighbour resize, so modules stay sharp.
+    """
+    qr = qrcode.QRCode(version=None, border=border)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    modules = qr.modules_count + 2 * border
+    qr.box_size = max(size // modules, 1)
+    img = qr.make_image(fill_color=fill_color, back_color=back_color).convert("RGB")
+    if img.size != (size, size):
+        img = img.resize((size, size), PILImage.NEAREST)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def render_qr_texture(payload, **params):
+    """Render `payload` straight to a Kivy texture (main thread only), uncached."""
+    from kivy.core.image import Image as CoreImage
+    return CoreImage(io.BytesIO(render_qr_png(payload, **params)), ext="png").texture
+
+
+def write_atomic(path, data):
+    """Write bytes to `path` via a temp file + rename so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def payload_digest(payload, **params):
+    """Stable hash of a payload and its render parameters, to skip unchanged files."""
+    blob = json.dumps([payload, sorted(params.items())], separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def render_qr_file(path, payload, params):
+    """Render `payload` and write it atomically to `path` (process-pool friendly)."""
+    write_atomic(path, render_qr_png(payload, **params))
+    return path
+
+
+class QrTextureCache:
+    """
+    LRU cache of QR codes as Kivy textures, keyed by payload and render
+    parameters. PNG bytes are rendered in memory and uploaded through
+    CoreImage; repeat requests for the same code reuse the texture.
+
+    texture() must be called on the Kivy main thread (GL upload).
+    save_async() optionally persists the PNG on a background thread.
+    """
+    def __init__(self, maxsize=64, **render_defaults):
+        self.maxsize = maxsize
+        self.render_defaults = render_defaults
+        self._entries = OrderedDict()   # key -> (png bytes, texture)
+        self._saved = set()             # (key, path) already written this run
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, payload, params):
+        merged = dict(self.render_defaults, **params)
+        return (payload,) + tuple(sorted(merged.items())), merged
+
+    def png(self, payload, **params):
+        """PNG bytes for the code (cached alongside the texture)."""
+        key, merged = self._key(payload, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        data = render_qr_png(payload, **merged)
+        with self._lock:
+            self._store(key, (data, None))
+        return data
+
+    def texture(self, payload, **params):
+        """Kivy texture for the code, rendered and uploaded on first use."""
+        from kivy.core.image import Image as CoreImage
+
+        key, _ = self._key(payload, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        data = self.png(payload, **params)
+        texture = CoreImage(io.BytesIO(data), ext="png").texture
+        with self._lock:
+            self._store(key, (data, texture))
+        return texture
+
+    def cached_texture(self, payload, **params):
+        """Texture if this code was already rendered, else None. Never renders."""
+        key, _ = self._key(payload, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def save_async(self, payload, path, **params):
+        """
+        Persist the PNG to `path` on a daemon thread; returns the thread, or
+        None when this code was already saved there during this run.
+        """
+        key, _ = self._key(payload, params)
+        with self._lock:
+            if (key, path) in self._saved:
+                return None
+            self._saved.add((key, path))
+
+        def save():
+            try:
+                write_atomic(path, self.png(payload, **params))
+            except Exception as e:
+                print(f"Error saving QR code to {path}: {e}")
+                with self._lock:
+                    self._saved.discard((key, path))
+        t = threading.Thread(target=save, name="qr-save", daemon=True)
+        t.start()
+        return t
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,156 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+
+# Rows changed this close to the watermark are re-read on the next refresh, in
+# case a transaction that started earlier commits after we looked.
+WATERMARK_OVERLAP_SECONDS = 5
+
+# Unknown roll numbers at login refresh the roster at most this often
+MISS_REFRESH_INTERVAL = 5
+
+
+class StudentRecord:
+    __slots__ = ("student_id", "name", "roll_no", "password_hash", "class_ids")
+
+    def __init__(self, student_id, name, roll_no, password_hash, class_ids):
+        self.student_id = student_id
+        self.name = name
+        self.roll_no = roll_no
+        self.password_hash = password_hash
+        self.class_ids = class_ids
+
+
+PASSWORD_HASH_PREFIX = "pbkdf2_sha256$"
+
+
+def hash_password(password, iterations=200_000, salt=None):
+    """Return a 'pbkdf2_sha256$iterations$salt$hash' string for Students.password_hash."""
+    salt = salt or secrets.token_hex(8)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+    return f"{PASSWORD_HASH_PREFIX}{iterations}${salt}${digest}"
+
+
+def verify_password(password, stored):
+    if stored.startswith(PASSWORD_HASH_PREFIX):
+        _, iterations, salt, digest = stored.split("$", 3)
+        candidate = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), int(iterations)).hex()
+        return hmac.compare_digest(candidate, digest)
+    # plain-text rows from the old hardcoded dict are hashed by tools/migrate.py
+    return False
+
+
+class Roster:
+    """
+    In-memory index of Students and their Enrollments.
+
+    Loaded once from the database, then kept current by refresh(), which only
+    reads students whose updated_at is past the last watermark. Lookups by
+    roll_no and student_id never touch the database.
+    """
+    def __init__(self, connection_factory):
+        self.connection_factory = connection_factory
+        self.by_id = {}         # student_id -> StudentRecord
+        self.by_roll = {}       # roll_no -> student_id
+        self.watermark = None
+        self.loaded = False
+        self._last_miss_refresh = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    # ---------------- loading ----------------
+    def refresh(self):
+        """Pull students changed since the watermark (everything on first call)."""
+        with self._refresh_lock:
+            with self.connection_factory() as conn:
+                with conn.cursor() as cur:
+                    if self.watermark is None:
+                        cur.execute("""
+                            SELECT s.student_id, s.name, s.roll_no, s.password_hash, s.updated_at,
+                                   COALESCE(array_agg(e.class_id) FILTER (WHERE e.class_id IS NOT NULL), '{}')
+                            FROM Students s
+                            LEFT JOIN Enrollments e ON e.student_id = s.student_id
+                            GROUP BY s.student_id
+                        """)
+                    else:
+                        cur.execute("""
+                            SELECT s.student_id, s.name, s.roll_no, s.password_hash, s.updated_at,
+                                   COALESCE(array_agg(e.class_id) FILTER (WHERE e.class_id IS NOT NULL), '{}')
+                            FROM Students s
+                            LEFT JOIN Enrollments e ON e.student_id = s.student_id
+                            WHERE s.updated_at > %s - %s * INTERVAL '1 second'
+                            GROUP BY s.student_id
+                        """, (self.watermark, WATERMARK_OVERLAP_SECONDS))
+                    rows = cur.fetchall()
+            self._apply(rows)
+            return len(rows)
+
+    def reload(self):
+        """Drop the watermark and rebuild the index from scratch (picks up deletions)."""
+        with self._refresh_lock:
+            self.watermark = None
+            with self._lock:
+                self.by_id = {}
+                self.by_roll = {}
+        return self.refresh()
+
+    def _apply(self, rows):
+        with self._lock:
+            for student_id, name, roll_no, password_hash, updated_at, class_ids in rows:
+                old = self.by_id.get(student_id)
+                if old and old.roll_no != roll_no:
+                    self.by_roll.pop(old.roll_no, None)
+                self.by_id[student_id] = StudentRecord(
+                    student_id, name, roll_no, password_hash, frozenset(class_ids)
+                )
+                self.by_roll[roll_no] = student_id
+                if self.watermark is None or updated_at > self.watermark:
+                    self.watermark = updated_at
+            self.loaded = True
+
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.refresh()
+
+    def start_auto_refresh(self, interval=60):
+        """Load now, then refresh every `interval` seconds on a daemon thread."""
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing roster: {e}")
+                time.sleep(interval)
+        t = threading.Thread(target=loop, name="roster-refresh", daemon=True)
+        t.start()
+        return t
+
+    # ---------------- lookups ----------------
+    def get(self, student_id):
+        return self.by_id.get(student_id)
+
+    def get_by_roll(self, roll_no):
+        student_id = self.by_roll.get(roll_no)
+        return self.by_id.get(student_id) if student_id is not None else None
+
+    def authenticate(self, roll_no, password):
+        """
+        Return the StudentRecord for valid credentials, else None. An unknown
+        roll_no triggers a (rate-limited) refresh in case the student was just
+        added.
+        """
+        self.ensure_loaded()
+        record = self.get_by_roll(roll_no)
+        now = time.monotonic()
+        if record is None and now - self._last_miss_refresh > MISS_REFRESH_INTERVAL:
+            self._last_miss_refresh = now
+            self.refresh()
+            record = self.get_by_roll(roll_no)
+        if record and verify_password(password, record.password_hash):
+            return record
+        return None
+
+    def __len__(self):
+        return len(self.by_id)
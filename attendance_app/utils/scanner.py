@@ -0,0 +1,294 @@
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+from pyzbar.pyzbar import decode
+
+# rect is (left, top, width, height) in full-frame pixel coordinates
+Detection = namedtuple("Detection", "data rect")
+
+
+class FramePreprocessor:
+    """
+    Shrinks a camera frame before it reaches pyzbar: grayscale, downscale to
+    at most `max_width` pixels wide, optionally Otsu-binarize.
+    Returns (image, scale) where scale maps processed pixels back to input pixels.
+    """
+    def __init__(self, grayscale=True, max_width=640, binarize=False):
+        self.grayscale = grayscale
+        self.max_width = max_width
+        self.binarize = binarize
+
+    def __call__(self, frame):
+        image = frame
+        if self.grayscale and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        scale = 1.0
+        width = image.shape[1]
+        if self.max_width and width > self.max_width:
+            scale = self.max_width / width
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if self.binarize:
+            if image.ndim == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return image, scale
+
+
+class RoiTracker:
+    """
+    Remembers where the last code was seen so the next frames only decode a
+    crop around it. The region grows by `margin` (fraction of the code size)
+    on each side and is dropped after `lost_after` frames without a hit.
+    """
+    def __init__(self, margin=0.5, lost_after=5):
+        self.margin = margin
+        self.lost_after = lost_after
+        self.roi = None
+        self.misses = 0
+
+    def crop(self, frame):
+        """Return (view, (offset_x, offset_y)); the whole frame when no ROI is tracked."""
+        if self.roi is None:
+            return frame, (0, 0)
+        x, y, w, h = self.roi
+        return frame[y:y + h, x:x + w], (x, y)
+
+    def update(self, rects, frame_shape):
+        left = min(r[0] for r in rects)
+        top = min(r[1] for r in rects)
+        right = max(r[0] + r[2] for r in rects)
+        bottom = max(r[1] + r[3] for r in rects)
+        pad_x = int((right - left) * self.margin)
+        pad_y = int((bottom - top) * self.margin)
+        frame_h, frame_w = frame_shape[:2]
+        x0, y0 = max(left - pad_x, 0), max(top - pad_y, 0)
+        x1, y1 = min(right + pad_x, frame_w), min(bottom + pad_y, frame_h)
+        self.roi = (x0, y0, x1 - x0, y1 - y0)
+        self.misses = 0
+
+    def miss(self):
+        if self.roi is not None:
+            self.misses += 1
+            if self.misses >= self.lost_after:
+                self.reset()
+
+    def reset(self):
+        self.roi = None
+        self.misses = 0
+
+
+class ScanStats:
+    """Decode throughput and time-to-first-decode for one scanning run."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.frames = 0
+        self.decode_seconds = 0.0
+        self.first_decode_at = None
+
+    def record(self, seconds, found):
+        self.frames += 1
+        self.decode_seconds += seconds
+        if found and self.first_decode_at is None:
+            self.first_decode_at = time.perf_counter()
+
+    def decode_fps(self):
+        """Frames the decoder could sustain if it ran back to back."""
+        return self.frames / self.decode_seconds if self.decode_seconds else 0.0
+
+    def loop_fps(self):
+        elapsed = time.perf_counter() - self.started
+        return self.frames / elapsed if elapsed else 0.0
+
+    def time_to_first_decode(self):
+        if self.first_decode_at is None:
+            return None
+        return self.first_decode_at - self.started
+
+    def report(self):
+        ttfd = self.time_to_first_decode()
+        ttfd_text = f"{ttfd * 1000:.0f} ms" if ttfd is not None else "n/a"
+        return (f"{self.frames} frames, decode {self.decode_fps():.1f} fps, "
+                f"loop {self.loop_fps():.1f} fps, first decode {ttfd_text}")
+
+
+class QrScanner:
+    """Preprocess -> crop to the tracked ROI -> pyzbar, with stats."""
+    def __init__(self, grayscale=True, max_width=640, binarize=False,
+                 track_roi=True, roi_margin=0.5, roi_lost_after=5):
+        self.preprocess = FramePreprocessor(grayscale, max_width, binarize)
+        self.tracker = RoiTracker(roi_margin, roi_lost_after) if track_roi else None
+        self.stats = ScanStats()
+
+    def scan(self, frame):
+        """Return a list of Detection for every QR code found in the frame."""
+        t0 = time.perf_counter()
+        region, (ox, oy) = self.tracker.crop(frame) if self.tracker else (frame, (0, 0))
+        image, scale = self.preprocess(region)
+        detections = []
+        for obj in decode(image):
+            left, top, width, height = obj.rect
+            rect = (int(left / scale) + ox, int(top / scale) + oy,
+                    int(width / scale), int(height / scale))
+            detections.append(Detection(obj.data.decode("utf-8", errors="ignore"), rect))
+        self.stats.record(time.perf_counter() - t0, bool(detections))
+
+        if self.tracker:
+            if detections:
+                self.tracker.update([d.rect for d in detections], frame.shape)
+            else:
+                self.tracker.miss()
+        return detections
+
+
+# ---------- Threaded capture / decode ----------
+class LatestFrameBuffer:
+    """
+    Small bounded frame buffer that drops the oldest frame when full.
+    A reader takes the newest frame and discards anything older, so a slow
+    decoder never works through a backlog of stale frames, and two decode
+    workers never get the same frame.
+    """
+    def __init__(self, maxsize=2):
+        self._frames = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._latest = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame):
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append(frame)
+            self._latest = frame
+            self._cond.notify()
+
+    def take_latest(self, timeout=None):
+        """Wait for a frame and return the newest one, or None on timeout or close."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed or self._frames, timeout)
+            if not self._frames:
+                return None
+            frame = self._frames.pop()
+            self.dropped += len(self._frames)
+            self._frames.clear()
+            return frame
+
+    def peek(self):
+        """Newest frame captured so far (for display); does not consume it."""
+        with self._cond:
+            return self._latest
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def _pace(next_at, interval):
+    """Sleep until `next_at` and return the following deadline (no-op when interval is 0)."""
+    if not interval:
+        return 0.0
+    now = time.perf_counter()
+    if next_at > now:
+        time.sleep(next_at - now)
+        now = next_at
+    return now + interval
+
+
+class ScanPipeline:
+    """
+    One capture thread feeding a LatestFrameBuffer, plus `decode_workers`
+    threads that each decode the newest frame with their own QrScanner.
+
+    Detections are pushed to `results` (a Queue of Detection lists holding
+    at most `results_size`; the oldest entry is dropped when nobody reads
+    them) and/or passed to `on_detections(detections)` on the worker thread.
+    Capture and decode rates are capped by max_capture_fps / max_decode_fps.
+    """
+    def __init__(self, capture, scanner_factory, buffer_size=2, decode_workers=1,
+                 max_capture_fps=30, max_decode_fps=15, on_detections=None, results_size=8):
+        self.capture = capture
+        self.scanner_factory = scanner_factory
+        self.buffer = LatestFrameBuffer(buffer_size)
+        self.decode_workers = decode_workers
+        self.capture_interval = 1.0 / max_capture_fps if max_capture_fps else 0.0
+        self.decode_interval = 1.0 / max_decode_fps if max_decode_fps else 0.0
+        self.on_detections = on_detections
+        self.results = queue.Queue(maxsize=results_size)
+        self.results_dropped = 0
+        self.scanners = []
+        self.capture_ended = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._threads.append(threading.Thread(target=self._capture_loop, name="scan-capture", daemon=True))
+        for i in range(self.decode_workers):
+            scanner = self.scanner_factory()
+            self.scanners.append(scanner)
+            self._threads.append(threading.Thread(
+                target=self._decode_loop, args=(scanner,), name=f"scan-decode-{i}", daemon=True
+            ))
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self, timeout=2):
+        self._stop.set()
+        self.buffer.close()
+        for t in self._threads:
+            t.join(timeout)
+
+    def running(self):
+        return not self._stop.is_set() and not self.capture_ended.is_set()
+
+    def latest_frame(self):
+        return self.buffer.peek()
+
+    def _capture_loop(self):
+        next_at = 0.0
+        while not self._stop.is_set():
+            next_at = _pace(next_at, self.capture_interval)
+            ret, frame = self.capture.read()
+            if not ret:
+                break
+            self.buffer.put(frame)
+        self.capture_ended.set()
+        self.buffer.close()
+
+    def _decode_loop(self, scanner):
+        next_at = 0.0
+        while not self._stop.is_set():
+            next_at = _pace(next_at, self.decode_interval)
+            frame = self.buffer.take_latest(timeout=0.5)
+            if frame is None:
+                if self.capture_ended.is_set():
+                    return
+                continue
+            detections = scanner.scan(frame)
+            if detections:
+                self._publish(detections)
+                if self.on_detections:
+                    self.on_detections(detections)
+
+    def _publish(self, detections):
+        """Queue detections without blocking, dropping the oldest when full."""
+        while True:
+            try:
+                self.results.put_nowait(detections)
+                return
+            except queue.Full:
+                try:
+                    self.results.get_nowait()
+                    self.results_dropped += 1
+                except queue.Empty:
+                    pass
+
+    def report(self):
+        parts = [f"worker {i}: {s.stats.report()}" for i, s in enumerate(self.scanners)]
+        parts.append(f"frames dropped: {self.buffer.dropped}")
+        return "; ".join(parts)
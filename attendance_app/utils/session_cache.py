@@ -0,0 +1,63 @@
+import threading
+import time
+
+
+class ActiveSessionCache:
+    """
+    In-process cache of the active session of each class.
+
+    Maps class_name -> (session_id, end_time). An entry expires exactly when
+    its session ends, so a scan after end_time always goes back to the
+    database. `loader(class_name)` must return (session_id, end_time,
+    seconds_left) for the active session, or None when there is none;
+    seconds_left is measured by the database clock so kiosk clock drift does
+    not move the expiry.
+    """
+    def __init__(self, loader, clock=time.monotonic):
+        self.loader = loader
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}      # class_name -> (session_id, end_time, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, class_name):
+        """Return the active session_id of `class_name`, or None if there is none."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(class_name)
+            if entry and entry[2] > now:
+                self.hits += 1
+                return entry[0]
+            self._entries.pop(class_name, None)
+            self.misses += 1
+
+        found = self.loader(class_name)
+        if found is None:
+            return None
+        session_id, end_time, seconds_left = found
+        self.put(class_name, session_id, end_time, seconds_left)
+        return session_id
+
+    def peek(self, class_name):
+        """Cached session_id of `class_name`, or None; never calls the loader."""
+        with self._lock:
+            entry = self._entries.get(class_name)
+            return entry[0] if entry and entry[2] > self.clock() else None
+
+    def put(self, class_name, session_id, end_time, seconds_left):
+        expires_at = self.clock() + max(float(seconds_left), 0.0)
+        with self._lock:
+            self._entries[class_name] = (session_id, end_time, expires_at)
+
+    def invalidate(self, class_name=None):
+        """Drop one class, or every class when `class_name` is None."""
+        with self._lock:
+            if class_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(class_name, None)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import hmac
+import time
+from collections import namedtuple
+
+SESSION_TOKEN_PREFIX = "SES:"
+PRINTED_TOKEN_PREFIX = "PRT:"   # long-lived codes printed ahead of time (tools/qr_pregen.py)
+SIGNATURE_BYTES = 16    # truncated HMAC-SHA256; keeps the QR code small
+
+SessionToken = namedtuple("SessionToken", "class_name session_id expires_at printed")
+
+
+class InvalidToken(Exception):
+    """Malformed token or bad signature."""
+
+
+class ExpiredToken(InvalidToken):
+    """Well-formed token whose expiry (plus allowed skew) has passed."""
+
+
+class MissingSecret(InvalidToken):
+    """No signing secret is configured, so tokens can be neither issued nor trusted."""
+
+
+def is_session_token(data):
+    return data.startswith((SESSION_TOKEN_PREFIX, PRINTED_TOKEN_PREFIX))
+
+
+class SessionTokenSigner:
+    """
+    Issues and verifies short-lived session QR payloads:
+
+        SES:<class_name>:<session_id>:<expires_at>:<signature>
+
+    Printed codes use the PRT: prefix instead, so the app can tell a code
+    that rotates on screen from one that can be photographed and reused
+    until the session ends. The prefix is signed too, so one kind cannot be
+    relabelled as the other.
+
+    The signature is an HMAC over the other fields, so verification needs
+    only the shared secret and the clock - no database round trip. Tokens
+    are valid for `ttl_seconds` after issue, with `skew_seconds` of grace
+    for clocks that disagree between the teacher and student devices.
+
+    An empty secret disables the signer: issue() and verify() raise
+    MissingSecret rather than fall back to a key anyone could read.
+    """
+    def __init__(self, secret, ttl_seconds=30, skew_seconds=5, clock=time.time):
+        if isinstance(secret, str):
+            secret = secret.encode("utf-8")
+        self.secret = secret or None
+        self.ttl = ttl_seconds
+        self.skew = skew_seconds
+        self.clock = clock
+
+    @property
+    def configured(self):
+        return self.secret is not None
+
+    def _sign(self, prefix, body):
+        if self.secret is None:
+            raise MissingSecret("no session token secret configured")
+        digest = hmac.new(self.secret, (prefix + body).encode("utf-8"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest[:SIGNATURE_BYTES]).rstrip(b"=").decode("ascii")
+
+    def issue(self, class_name, session_id, expires_at=None, printed=False):
+        """
+        Return a token for `session_id` that expires ttl_seconds from now, or
+        at `expires_at` (unix seconds). `printed` marks a code made ahead of
+        time with the PRT: prefix.
+        """
+        if expires_at is None:
+            expires_at = int(self.clock()) + self.ttl
+        expires_at = int(expires_at)
+        prefix = PRINTED_TOKEN_PREFIX if printed else SESSION_TOKEN_PREFIX
+        body = f"{class_name}:{int(session_id)}:{expires_at}"
+        return f"{prefix}{body}:{self._sign(prefix, body)}"
+
+    def verify(self, data):
+        """
+        Return the SessionToken carried by `data`.
+        Raises ExpiredToken or InvalidToken; neither touches the database.
+        """
+        if not is_session_token(data):
+            raise InvalidToken("not a session token")
+        prefix = data[:len(SESSION_TOKEN_PREFIX)]     # both prefixes are four characters
+        parts = data[len(prefix):].split(":")
+        if len(parts) != 4 or not parts[0]:
+            raise InvalidToken("malformed session token")
+        class_name, session_id, expires_at, signature = parts
+        try:
+            session_id, expires_at = int(session_id), int(expires_at)
+        except ValueError:
+            raise InvalidToken("malformed session token")
+
+        if self.clock() > expires_at + self.skew:
+            raise ExpiredToken("session token expired")
+        body = f"{class_name}:{session_id}:{expires_at}"
+        # bytes, because compare_digest rejects non-ASCII str and payloads are untrusted
+        if not hmac.compare_digest(signature.encode("utf-8"), self._sign(prefix, body).encode("ascii")):
+            raise InvalidToken("bad session token signature")
+        return SessionToken(class_name, session_id, expires_at, prefix == PRINTED_TOKEN_PREFIX)
@@ -0,0 +1,272 @@
+# attendance_log.py
+# Append-only attendance event log behind the CSV backend of qr.py.
+#
+# Marks are appended to a log segment (one line each, fsync'd in small
+# batches) instead of rewriting attendance.csv, and counts are kept in
+# memory. Compaction writes the counts back to attendance.csv in its usual
+# Name,<subjects...> format and starts a fresh segment.
+#
+# Crash safety: every segment starts with "# base=<sha256>", the hash of
+# the snapshot CSV it applies on top of. On load a segment is replayed only
+# if its base matches the snapshot as rebuilt so far, so a crash halfway
+# through compaction neither loses nor double-counts marks.
+
+import csv
+import glob
+import hashlib
+import io
+import os
+import threading
+import time
+
+SEGMENT_HEADER = "# base="
+
+
+class LogInUse(Exception):
+    """Another process already has this attendance log open."""
+
+
+def _lock_exclusive(f):
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        raise LogInUse(f"{f.name} is locked by another process")
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _fsync_dir(path):
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AttendanceLog:
+    """
+    Attendance counts for the CSV backend, backed by an append-only log.
+
+    mark() is an O(1) in-memory update plus a queued log line; a flusher
+    thread writes and fsyncs queued lines every `flush_interval` seconds.
+    The snapshot CSV is rewritten after `compact_every` marks or
+    `compact_interval` seconds, and on close(). One process at a time may
+    open the log (enforced with a lock file).
+    """
+    def __init__(self, csv_path, flush_interval=0.05, compact_every=500, compact_interval=60):
+        self.csv_path = csv_path
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+
+        self._lockfile = open(csv_path + ".lock", "a+")
+        try:
+            _lock_exclusive(self._lockfile)
+        except LogInUse:
+            self._lockfile.close()
+            raise
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = []
+        self._segment = None
+        self._segment_no = 0
+        self._marks_since_compact = 0
+        self._compacted_at = time.monotonic()
+        self._closed = False
+
+        if self._load():
+            # fold what was replayed into the CSV so the next start is a plain read
+            self.compact()
+        else:
+            self._start_segment(self._snapshot_hash)
+        self._thread = threading.Thread(target=self._flush_loop, name="attendance-log", daemon=True)
+        self._thread.start()
+
+    # ---------------- loading ----------------
+    def _segments(self):
+        paths = glob.glob(glob.escape(self.csv_path) + ".log.*")
+        numbered = []
+        for path in paths:
+            suffix = path.rsplit(".", 1)[1]
+            if suffix.isdigit():
+                numbered.append((int(suffix), path))
+        return sorted(numbered)
+
+    def _load(self):
+        with open(self.csv_path, "rb") as f:
+            data = f.read()
+        reader = csv.reader(io.StringIO(data.decode("utf-8")))
+        header = next(reader)
+        self.subjects = header[1:]
+        self.names = []
+        self.counts = {}
+        for row in reader:
+            if not row:
+                continue
+            self.names.append(row[0])
+            self.counts[row[0]] = {s: int(v or 0) for s, v in zip(self.subjects, row[1:])}
+
+        base = _sha256(data)
+        replayed = 0    # segments replayed
+        skipped = []
+        for number, path in self._segments():
+            self._segment_no = max(self._segment_no, number)
+            with open(path, encoding="utf-8", newline="") as f:
+                text = f.read()
+            lines = text.split("\n")
+            if not lines[0].startswith(SEGMENT_HEADER) or lines[0][len(SEGMENT_HEADER):] != base:
+                skipped.append((path, replayed))
+                continue
+            # the last element is "" after a final newline, or a torn line from a crash
+            for row in csv.reader(lines[1:-1]):
+                if len(row) == 3:
+                    self._apply(row[1], row[2])
+            replayed += 1
+            base = _sha256(self._snapshot_bytes())
+
+        for path, replayed_before in skipped:
+            if replayed > replayed_before:
+                # a later segment applies, so this one was already folded into the CSV
+                os.remove(path)
+            else:
+                # the CSV was probably edited by hand; keep the marks for inspection
+                print(f"Attendance log {path} does not apply to {self.csv_path}; moved to .stale")
+                os.replace(path, path + ".stale")
+        self._snapshot_hash = base
+        return replayed
+
+    def _apply(self, name, subject):
+        row = self.counts.get(name)
+        if row is None or subject not in row:
+            return False
+        row[subject] += 1
+        return True
+
+    # ---------------- segments and snapshots ----------------
+    def _snapshot_bytes(self):
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(["Name"] + self.subjects)
+        for name in self.names:
+            writer.writerow([name] + [self.counts[name][s] for s in self.subjects])
+        return buf.getvalue().encode("utf-8")
+
+    def _start_segment(self, base):
+        self._segment_no += 1
+        path = f"{self.csv_path}.log.{self._segment_no}"
+        segment = open(path, "a", encoding="utf-8", newline="")
+        segment.write(f"{SEGMENT_HEADER}{base}\n")
+        segment.flush()
+        os.fsync(segment.fileno())
+        _fsync_dir(path)
+        old, self._segment = self._segment, segment
+        if old is not None:
+            old.close()
+
+    def _write_pending(self):
+        """Append and fsync queued lines. Caller holds the lock."""
+        if not self._pending:
+            return
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerows(self._pending)
+        self._segment.write(buf.getvalue())
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+        self._pending = []
+
+    def compact(self):
+        """Write the counts to the snapshot CSV and drop the folded log segments."""
+        with self._lock:
+            self._write_pending()
+            data = self._snapshot_bytes()
+            new_hash = _sha256(data)
+            old_segments = [path for _, path in self._segments()]
+            # new marks go to a segment based on the snapshot about to be written
+            self._start_segment(new_hash)
+            tmp_path = self.csv_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.csv_path)
+            _fsync_dir(self.csv_path)
+            for path in old_segments:
+                os.remove(path)
+            self._snapshot_hash = new_hash
+            self._marks_since_compact = 0
+            self._compacted_at = time.monotonic()
+
+    # ---------------- writes ----------------
+    def mark(self, name, subject):
+        """Count one attendance; False for an unknown student or subject."""
+        with self._lock:
+            if self._closed or not self._apply(name, subject):
+                return False
+            self._pending.append([f"{time.time():.3f}", name, subject])
+            self._marks_since_compact += 1
+            if len(self._pending) == 1:
+                self._wakeup.notify()
+            return True
+
+    def flush(self):
+        with self._lock:
+            self._write_pending()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait(self.compact_interval)
+                    if time.monotonic() - self._compacted_at >= self.compact_interval:
+                        break
+                if self._closed:
+                    return
+            # let more marks join this batch before paying for an fsync
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+                due = (self._marks_since_compact >= self.compact_every
+                       or (self._marks_since_compact
+                           and time.monotonic() - self._compacted_at >= self.compact_interval))
+                if due:
+                    self.compact()
+            except Exception as e:
+                print("Error writing attendance log:", e)
+
+    # ---------------- reads ----------------
+    def student_counts(self, name):
+        """{subject: count} for one student, or None if unknown."""
+        with self._lock:
+            row = self.counts.get(name)
+            return dict(row) if row is not None else None
+
+    def rows(self):
+        """(["Name", subjects...], [[name, counts...], ...]) in snapshot order."""
+        with self._lock:
+            return (["Name"] + self.subjects,
+                    [[name] + [self.counts[name][s] for s in self.subjects] for name in self.names])
+
+    def close(self):
+        """Flush, compact and release the lock file."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join(timeout=2)
+        try:
+            self.compact()
+        finally:
+            self._segment.close()
+            self._lockfile.close()
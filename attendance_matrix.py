@@ -0,0 +1,187 @@
+# attendance_matrix.py
+# Binary attendance storage for offline / CSV deployments of qr.py.
+#
+# File layout (little endian):
+#   magic "ATTM", u32 version, u32 students, u32 subjects, u32 data offset
+#   JSON index {"subjects": [...], "students": [...]}, zero padded
+#   uint32 matrix [students x subjects], row major, starting at the data offset
+#
+# The matrix is mapped with mmap and viewed through NumPy, so reading a
+# student's row or a subject's column copies nothing, and a mark is an
+# in-place increment of one cell.
+#
+# Usage:
+#   python attendance_matrix.py import attendance.csv attendance.mat
+#   python attendance_matrix.py export attendance.mat attendance.csv
+
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+
+import numpy as np
+
+MAGIC = b"ATTM"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")
+DATA_ALIGN = 64
+CELL = np.dtype("<u4")
+LOCK_STRIPES = 64
+
+
+def _lock_cell(fd, offset):
+    """Exclusive lock on one cell's bytes, so other processes cannot interleave."""
+    if os.name == "nt":
+        import msvcrt
+        os.lseek(fd, offset, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, CELL.itemsize)
+    else:
+        import fcntl
+        fcntl.lockf(fd, fcntl.LOCK_EX, CELL.itemsize, offset, os.SEEK_SET)
+
+
+def _unlock_cell(fd, offset):
+    if os.name == "nt":
+        import msvcrt
+        os.lseek(fd, offset, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, CELL.itemsize)
+    else:
+        import fcntl
+        fcntl.lockf(fd, fcntl.LOCK_UN, CELL.itemsize, offset, os.SEEK_SET)
+
+
+def create_matrix(path, students, subjects, values=None):
+    """Write a new matrix file; `values` is an optional students x subjects array."""
+    index = json.dumps({"subjects": list(subjects), "students": list(students)}).encode("utf-8")
+    data_offset = -(-(HEADER.size + len(index)) // DATA_ALIGN) * DATA_ALIGN
+    matrix = np.zeros((len(students), len(subjects)), dtype=CELL)
+    if values is not None:
+        matrix[:] = values
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(students), len(subjects), data_offset))
+        f.write(index)
+        f.write(b"\0" * (data_offset - HEADER.size - len(index)))
+        f.write(matrix.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class AttendanceMatrix:
+    """
+    Student x subject attendance counts in a memory-mapped uint32 matrix.
+    Same interface as attendance_log.AttendanceLog (mark, student_counts,
+    rows, close), so qr.py can use either.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, version, n_students, n_subjects, data_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an attendance matrix (v{VERSION})")
+        index = json.loads(bytes(self._mm[HEADER.size:data_offset]).rstrip(b"\0"))
+        self.subjects = index["subjects"]
+        self.names = index["students"]
+        self.subject_index = {s: j for j, s in enumerate(self.subjects)}
+        self.student_index = {n: i for i, n in enumerate(self.names)}
+        self.data_offset = data_offset
+        self.matrix = np.ndarray((n_students, n_subjects), dtype=CELL,
+                                 buffer=self._mm, offset=data_offset)
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    # ---------------- writes ----------------
+    def mark(self, name, subject):
+        """Increment one cell in place; False for an unknown student or subject."""
+        i = self.student_index.get(name)
+        j = self.subject_index.get(subject)
+        if i is None or j is None:
+            return False
+        cell = i * len(self.subjects) + j
+        offset = self.data_offset + cell * CELL.itemsize
+        # threads are serialized by the stripe lock, processes by the byte-range lock
+        with self._stripes[cell % LOCK_STRIPES]:
+            _lock_cell(self._file.fileno(), offset)
+            try:
+                self.matrix[i, j] += 1
+            finally:
+                _unlock_cell(self._file.fileno(), offset)
+        return True
+
+    def flush(self):
+        self._mm.flush()
+
+    # ---------------- reads (views into the mapping, no copies) ----------------
+    def student_row(self, name):
+        i = self.student_index.get(name)
+        return None if i is None else self.matrix[i]
+
+    def subject_column(self, subject):
+        j = self.subject_index.get(subject)
+        return None if j is None else self.matrix[:, j]
+
+    def student_counts(self, name):
+        """{subject: count} for one student, or None if unknown."""
+        row = self.student_row(name)
+        return None if row is None else dict(zip(self.subjects, row.tolist()))
+
+    def rows(self):
+        """(["Name", subjects...], [[name, counts...], ...]) like AttendanceLog.rows()."""
+        return (["Name"] + self.subjects,
+                [[name] + counts for name, counts in zip(self.names, self.matrix.tolist())])
+
+    def close(self):
+        """
+        Flush and unmap. Arrays from student_row() / subject_column() are
+        views into the mapping; drop them first. While one is still alive
+        the mapping cannot be closed, and is released with the last view.
+        """
+        self.matrix = None
+        if not self._mm.closed:
+            self._mm.flush()
+            try:
+                self._mm.close()
+            except BufferError:
+                pass    # a caller still holds a view; it keeps the mapping alive
+        self._file.close()
+
+
+# ---------------- CSV interoperability ----------------
+def import_csv(csv_path, matrix_path):
+    """Build a matrix file from a Name,<subjects...> CSV."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [row for row in reader if row]
+    values = np.array([[int(v or 0) for v in row[1:]] for row in rows], dtype=CELL)
+    create_matrix(matrix_path, [row[0] for row in rows], header[1:],
+                  values.reshape(len(rows), len(header) - 1))
+
+
+def export_csv(matrix_path, csv_path):
+    """Write a matrix file back out in the Name,<subjects...> CSV format."""
+    matrix = AttendanceMatrix(matrix_path)
+    try:
+        header, rows = matrix.rows()
+    finally:
+        matrix.close()
+    tmp_path = csv_path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+    os.replace(tmp_path, csv_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        print("usage: python attendance_matrix.py import|export <source> <destination>")
+        sys.exit(2)
+    command, source, destination = sys.argv[1:]
+    (import_csv if command == "import" else export_csv)(source, destination)
+    print(f"{command}ed {source} -> {destination}")
@@ -16,6 +16,8 @@ from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.image import Image as KivyImage
 from kivy.uix.label import Label
 from kivy.uix.button import Button
@@ -25,6 +27,10 @@ from kivy.clock import mainthread
 from kivy.core.window import Window
 from kivy.graphics import Color, Rectangle
 from kivy.utils import get_color_from_hex
+from kivy.properties import ListProperty
+
+from attendance_log import AttendanceLog
+from attendance_matrix import AttendanceMatrix, import_csv
 
 # ---------- Data / constants (unchanged from your original code) ----------
 TEACHER_CREDENTIALS = {
@@ -40,6 +46,10 @@ TEACHER_CREDENTIALS = {
 }
 EXPECTED_WIFI = "Mayank"
 CSV_FILE = "attendance.csv"
+# "log": CSV_FILE plus an append-only event log (attendance_log.py)
+# "matrix": memory-mapped uint32 matrix in MATRIX_FILE (attendance_matrix.py)
+ATTENDANCE_STORAGE = "log"
+MATRIX_FILE = "attendance.mat"
 
 students = {
     "11": ("Arin", "arin"),
@@ -66,16 +76,34 @@ def get_wifi_ssid():
     return None
 
 
+attendance_store = None
+
+
+def get_attendance_store():
+    """
+    Open the attendance store selected by ATTENDANCE_STORAGE on first use.
+    Both stores count marks per student and subject with the same methods.
+    The matrix file is imported from CSV_FILE the first time it is needed.
+    """
+    global attendance_store
+    if attendance_store is None:
+        if ATTENDANCE_STORAGE == "matrix":
+            if not os.path.exists(MATRIX_FILE):
+                ensure_attendance_csv()
+                import_csv(CSV_FILE, MATRIX_FILE)
+            attendance_store = AttendanceMatrix(MATRIX_FILE)
+        else:
+            attendance_store = AttendanceLog(CSV_FILE)
+    return attendance_store
+
+
 def update_attendance(student_name, subject):
     """
-    Same logic as original: load CSV, increment the subject column for the named student.
+    Same logic as original: increment the subject column for the named student,
+    now as an O(1) update of the attendance store instead of rewriting the CSV.
     """
     try:
-        df = pd.read_csv(CSV_FILE)
-        if subject in df.columns and student_name in df["Name"].values:
-            # safer increment to avoid SettingWithCopy warnings
-            df.loc[df["Name"] == student_name, subject] = df.loc[df["Name"] == student_name, subject].astype(int) + 1
-            df.to_csv(CSV_FILE, index=False)
+        if get_attendance_store().mark(student_name, subject):
             print(f"Attendance updated for {student_name} in {subject}.")
             return True
         print("Invalid Subject or Student Name")
@@ -481,9 +509,34 @@ class TeacherDashboardScreen(Screen):
         self.bg_rect.pos = self.pos
 
 
+class CsvRow(BoxLayout):
+    """
+    One recycled row of the CSV view: RecycleView assigns `cells` and the
+    row rewrites its labels in place instead of building new widgets.
+    """
+    cells = ListProperty()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.labels = []
+        self.bind(cells=self._update_cells)
+
+    def _update_cells(self, instance, cells):
+        while len(self.labels) < len(cells):
+            label = Label()
+            self.labels.append(label)
+            self.add_widget(label)
+        # a shorter row (ragged CSV line) must not show the last row's extra cells
+        while len(self.labels) > len(cells):
+            self.remove_widget(self.labels.pop())
+        for label, value in zip(self.labels, cells):
+            label.text = value
+
+
 class AttendanceViewScreen(Screen):
     """
     Generic screen to show a full CSV in a scrollable grid (teacher view).
+    Only the visible rows exist as widgets; they are reused while scrolling.
     """
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -492,31 +545,31 @@ class AttendanceViewScreen(Screen):
         back_btn.bind(on_press=lambda inst: App.get_running_app().go_to_screen("teacher_dashboard"))
         self.container.add_widget(back_btn)
 
-        self.scroll = ScrollView(size_hint=(1, 0.9))
-        self.grid = GridLayout(cols=1, size_hint_y=None)
-        self.grid.bind(minimum_height=self.grid.setter('height'))
-        self.scroll.add_widget(self.grid)
-        self.container.add_widget(self.scroll)
+        self.header = BoxLayout(size_hint_y=None, height=30)
+        self.container.add_widget(self.header)
+
+        self.rows = RecycleView(viewclass=CsvRow, size_hint=(1, 0.9))
+        layout = RecycleBoxLayout(orientation="vertical", default_size=(None, 28),
+                                  default_size_hint=(1, None), size_hint_y=None)
+        layout.bind(minimum_height=layout.setter('height'))
+        self.rows.add_widget(layout)
+        self.container.add_widget(self.rows)
 
         self.add_widget(self.container)
 
     def populate_from_csv(self, df):
         """
-        Create a header row and then a label per CSV row.
+        Create a header row and hand the CSV rows to the recycled list.
         """
-        self.grid.clear_widgets()
-        # header
-        header_layout = GridLayout(cols=len(df.columns), size_hint_y=None, height=30)
-        for col in df.columns:
-            header_layout.add_widget(Label(text=str(col)))
-        self.grid.add_widget(header_layout)
+        self.populate_from_rows(df.columns, df.itertuples(index=False, name=None))
 
-        # rows
-        for _, row in df.iterrows():
-            row_layout = GridLayout(cols=len(df.columns), size_hint_y=None, height=28)
-            for val in row:
-                row_layout.add_widget(Label(text=str(val)))
-            self.grid.add_widget(row_layout)
+    def populate_from_rows(self, columns, rows):
+        self.header.clear_widgets()
+        for col in columns:
+            self.header.add_widget(Label(text=str(col)))
+
+        self.rows.data = [{"cells": [str(val) for val in row]} for row in rows]
+        self.rows.scroll_y = 1
 
 
 class StudentAttendanceScreen(Screen):
@@ -543,18 +596,15 @@ class StudentAttendanceScreen(Screen):
 
     def populate_for_student(self, student_name):
         """
-        Read CSV, find the row and populate subject/value pairs.
+        Look up the student's counts and populate subject/value pairs.
         """
         self.grid.clear_widgets()
         try:
-            df = pd.read_csv(CSV_FILE)
-            if student_name not in df["Name"].values:
+            counts = get_attendance_store().student_counts(student_name)
+            if counts is None:
                 App.get_running_app().popup("Error", "Attendance record not found!")
                 return
-            student_attendance = df[df["Name"] == student_name].drop(columns=["Name"])
-            subjects = list(student_attendance.columns)
-            values = student_attendance.iloc[0].values
-            for s, v in zip(subjects, values):
+            for s, v in counts.items():
                 self.grid.add_widget(Label(text=str(s)))
                 self.grid.add_widget(Label(text=str(v)))
             self.title_label.text = f"Attendance - {student_name}"
@@ -725,8 +775,8 @@ class AttendanceApp(App):
     # ---------------- screens to show attendance ----------------
     def show_teacher_attendance_screen(self):
         try:
-            df = pd.read_csv(CSV_FILE)
-            self.attendance_view_screen.populate_from_csv(df)
+            columns, rows = get_attendance_store().rows()
+            self.attendance_view_screen.populate_from_rows(columns, rows)
             self.go_to_screen("attendance_view")
         except Exception as e:
             self.popup("Error", f"Failed to load attendance: {e}")
@@ -738,6 +788,11 @@ class AttendanceApp(App):
         self.student_attendance_screen.populate_for_student(self.student_name)
         self.go_to_screen("student_attendance")
 
+    def on_stop(self):
+        # flush pending marks (and the final CSV snapshot in "log" mode)
+        if attendance_store is not None:
+            attendance_store.close()
+
 
 if __name__ == "__main__":
     AttendanceApp().run()
@@ -1,6 +1,9 @@
 -- ======================================================
 -- ERP Attendance Database Schema
 -- ======================================================
+-- NOTE: the live schema is managed by the versioned scripts in
+-- attendance_app/migrations (apply with `python -m tools.migrate` from
+-- attendance_app). This file keeps the original design notes and queries.
 
 -- ---------- 1. Teachers ----------
 CREATE TABLE Teachers (
@@ -115,4 +118,4 @@ INSERT INTO Attendance (subject_id, student_id, marked_at)
 SELECT 2, 4, NOW()
 FROM Ongoing_classes oc
 WHERE oc.subject_id = 2
-  AND NOW() BETWEEN oc.marked_at AND oc.marked_at + INTERVAL '1 hour';
\ No newline at end of file
+  AND NOW() BETWEEN oc.marked_at AND oc.marked_at + INTERVAL '1 hour';
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# attendance_log.py / attendance_matrix.py sit next to qr.py at the top level
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+import pytest
+
+from attendance_log import AttendanceLog, LogInUse
+
+
+def crash(log):
+    """Stop using `log` the way a killed process would: no compaction."""
+    log.flush()
+    with log._lock:
+        log._closed = True
+        log._wakeup.notify()
+    log._segment.close()
+    log._lockfile.close()
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "attendance.csv"
+    path.write_text("Name,DMS,OS\nArin,0,1\nGatik,2,0\n")
+    return str(path)
+
+
+def test_marks_survive_a_crash_before_compaction(csv_path):
+    log = AttendanceLog(csv_path, compact_every=10_000, compact_interval=3600)
+    assert log.mark("Arin", "DMS")
+    assert not log.mark("Nobody", "DMS")
+    crash(log)
+
+    reopened = AttendanceLog(csv_path)
+    try:
+        assert reopened.counts["Arin"] == {"DMS": 1, "OS": 1}
+    finally:
+        reopened.close()
+    with open(csv_path) as f:
+        assert f.read() == "Name,DMS,OS\nArin,1,1\nGatik,2,0\n"
+
+
+def test_one_process_at_a_time(csv_path):
+    log = AttendanceLog(csv_path)
+    try:
+        with pytest.raises(LogInUse):
+            AttendanceLog(csv_path)
+    finally:
+        log.close()
+
+
+def test_segment_for_an_edited_csv_is_set_aside(csv_path, tmp_path):
+    log = AttendanceLog(csv_path, compact_every=10_000, compact_interval=3600)
+    log.mark("Gatik", "OS")
+    crash(log)
+    with open(csv_path, "w") as f:
+        f.write("Name,DMS,OS\nArin,5,5\nGatik,5,5\n")
+
+    reopened = AttendanceLog(csv_path)
+    reopened.close()
+    assert reopened.counts["Gatik"] == {"DMS": 5, "OS": 5}
+    assert [p.name for p in tmp_path.glob("*.stale")] == ["attendance.csv.log.1.stale"]
@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from attendance_matrix import AttendanceMatrix, create_matrix, export_csv, import_csv  # noqa: E402
+
+
+@pytest.fixture
+def matrix(tmp_path):
+    path = str(tmp_path / "attendance.mat")
+    create_matrix(path, ["Arin", "Gatik"], ["DMS", "OS"])
+    m = AttendanceMatrix(path)
+    yield m
+    m.close()
+
+
+def test_mark_and_read(matrix):
+    assert matrix.mark("Arin", "OS")
+    assert matrix.mark("Arin", "OS")
+    assert not matrix.mark("Nobody", "OS")
+    assert matrix.student_counts("Arin") == {"DMS": 0, "OS": 2}
+    assert matrix.subject_column("OS").tolist() == [2, 0]
+
+
+def test_close_with_a_view_still_held(matrix):
+    row = matrix.student_row("Arin")
+    matrix.mark("Arin", "DMS")
+    matrix.close()      # must not raise BufferError
+    assert row.tolist() == [1, 0]
+    del row
+
+
+def test_csv_round_trip(tmp_path):
+    src = tmp_path / "attendance.csv"
+    src.write_text("Name,DMS,OS\nArin,3,1\nGatik,0,2\n")
+    import_csv(str(src), str(tmp_path / "attendance.mat"))
+    export_csv(str(tmp_path / "attendance.mat"), str(tmp_path / "out.csv"))
+    assert (tmp_path / "out.csv").read_text() == src.read_text()